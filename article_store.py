@@ -0,0 +1,125 @@
+"""
+세션별 뉴스 분석 결과를 가볍게 유지하기 위한 기사 저장소.
+본문/요약은 DB의 articles 테이블에 한 번만 저장하고, 세션에는 ArticleRecord
+(article_id, 관심도, 점수, 키워드 id)만 둔다. 화면에 그릴 기사만 hydrate()로 본문을 채우며,
+본문은 모든 세션이 공유하는 프로세스 전역 LRU 캐시에서 꺼낸다.
+"""
+import itertools
+import threading
+from collections import OrderedDict
+
+from config import ARTICLE_CACHE_SIZE
+
+
+class ArticleRecord:
+    """세션에 보관하는 기사 1건의 분석 결과 (본문 없음)"""
+    __slots__ = ("article_id", "risk_level", "risk_score", "keyword_ids")
+
+    def __init__(self, article_id, risk_level, risk_score, keyword_ids):
+        self.article_id = article_id
+        self.risk_level = risk_level
+        self.risk_score = risk_score
+        self.keyword_ids = keyword_ids
+
+    def __repr__(self):
+        return f"ArticleRecord({self.article_id}, {self.risk_level!r}, {self.risk_score:.2f})"
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_temp_ids = itertools.count(-1, -1)  # DB 저장 실패 시 쓰는 임시 id (음수라 실제 id와 겹치지 않음)
+
+
+def compact_news(news_data, vocab=None):
+    """
+    뉴스 목록(article_id 포함)을 (ArticleRecord 튜플, 키워드 목록)으로 변환.
+    키워드 문자열은 세션당 한 번만 두고 기사에는 인덱스만 담는다.
+    """
+    vocab = list(vocab or [])
+    index = {kw: i for i, kw in enumerate(vocab)}
+    records = []
+    for n in news_data:
+        keyword_ids = []
+        for kw in n["keywords"]:
+            if kw not in index:
+                index[kw] = len(vocab)
+                vocab.append(kw)
+            keyword_ids.append(index[kw])
+        records.append(ArticleRecord(n["article_id"], n["risk_level"], n["risk_score"], tuple(keyword_ids)))
+    return tuple(records), vocab
+
+
+def store_articles(news_data):
+    """
+    뉴스 본문을 articles 테이블에 저장하고 각 항목에 article_id를 채운다. 반환: news_data
+    DB 저장에 실패하면 임시 id(음수)를 붙여 본문을 프로세스 캐시에만 둔다.
+    임시 id 기사는 실행 기록 저장(save_analysis_run) 때 다시 upsert된다.
+    """
+    from database import upsert_articles
+    try:
+        ids = upsert_articles(news_data)
+    except Exception as e:
+        print(f"기사 본문 저장 실패 (메모리 캐시만 사용): {e}")
+        ids = {}
+    for n in news_data:
+        n["article_id"] = ids.get(n["url"]) or next(_temp_ids)
+        _remember(n["article_id"], (n["url"], n["title"], n.get("source"), n.get("published"), n["full_content"]))
+    return news_data
+
+
+def _remember(article_id, body):
+    with _cache_lock:
+        _cache[article_id] = body
+        _cache.move_to_end(article_id)
+        while len(_cache) > ARTICLE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def load_articles(article_ids):
+    """기사 본문 조회 (캐시 우선, 없으면 DB). 반환: {article_id: (url, title, source, published, content)}"""
+    found, missing = {}, []
+    with _cache_lock:
+        for article_id in article_ids:
+            if article_id in _cache:
+                _cache.move_to_end(article_id)
+                found[article_id] = _cache[article_id]
+            else:
+                missing.append(article_id)
+    if missing:
+        from database import get_articles
+        try:
+            loaded = get_articles(missing)
+        except Exception as e:
+            print(f"기사 본문 조회 실패: {e}")
+            loaded = {}
+        for article_id, body in loaded.items():
+            _remember(article_id, body)
+        found.update(loaded)
+    return found
+
+
+def hydrate(records, vocab):
+    """ArticleRecord 목록을 화면/즐겨찾기용 뉴스 dict(기존 news_data 형식)로 복원"""
+    bodies = load_articles([r.article_id for r in records])
+    news = []
+    for r in records:
+        url, title, source, published, content = bodies.get(r.article_id, ("", "(삭제된 기사)", "", "", ""))
+        content = content or ""
+        news.append({
+            "article_id": r.article_id,
+            "title": title,
+            "summary": content[:250] + "..." if len(content) > 250 else content,
+            "full_content": content,
+            "source": source,
+            "published": published,
+            "risk_level": r.risk_level,
+            "risk_score": r.risk_score,
+            "keywords": [vocab[i] for i in r.keyword_ids],
+            "url": url,
+        })
+    return news
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
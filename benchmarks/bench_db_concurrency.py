@@ -0,0 +1,126 @@
+"""
+동시 읽기/쓰기 상황에서 즐겨찾기 DB 처리량과 잠금 오류 수 비교.
+- legacy: 호출마다 sqlite3.connect → 실행 → close (기존 database.py 방식, 롤백 저널)
+- pooled: database.get_connection() 스레드별 영속 연결 (WAL, busy_timeout)
+
+실행:
+    python -m benchmarks.bench_db_concurrency --threads 8 --ops 300
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import database
+
+_INSERT = "INSERT OR IGNORE INTO saved_news (title, url, summary, keywords, risk_level, risk_score) VALUES (?, ?, ?, ?, ?, ?)"
+_SELECT = "SELECT * FROM saved_news ORDER BY saved_at DESC"
+
+
+def _row(tid: int, i: int):
+    return (f"기사 {tid}-{i}", f"https://example.com/{tid}/{i}", "요약 " * 20, '["랜섬웨어"]', "높음", 2.5)
+
+
+def _legacy_op(path: str, write: bool, row):
+    conn = sqlite3.connect(path, timeout=1.0)
+    try:
+        if write:
+            conn.execute(_INSERT, row)
+            conn.commit()
+        else:
+            conn.execute(_SELECT).fetchall()
+    finally:
+        conn.close()
+
+
+def _pooled_op(path: str, write: bool, row):
+    if write:
+        with database.transaction() as conn:
+            conn.execute(_INSERT, row)
+    else:
+        database.get_connection().execute(_SELECT).fetchall()
+
+
+def run(mode: str, threads: int, ops: int, write_ratio: float, seed_rows: int):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    database.set_db_path(path)
+    database.init_db()
+    with database.transaction() as conn:
+        conn.executemany(_INSERT, [_row(-1, i) for i in range(seed_rows)])
+    database.close_connection()
+    if mode == "legacy":
+        # 기존 동작 재현: 롤백 저널 모드
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+    op = _legacy_op if mode == "legacy" else _pooled_op
+    errors, latencies, lock = [0], [], threading.Lock()
+
+    def worker(tid: int):
+        rng = random.Random(tid)
+        local = []
+        for i in range(ops):
+            write = rng.random() < write_ratio
+            start = time.perf_counter()
+            try:
+                op(path, write, _row(tid, i))
+            except sqlite3.OperationalError:
+                with lock:
+                    errors[0] += 1
+            local.append((time.perf_counter() - start) * 1000.0)
+        if mode == "pooled":
+            database.close_connection()
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    latencies.sort()
+    total = threads * ops
+    return {
+        "mode": mode,
+        "ops": total,
+        "elapsed_s": round(elapsed, 3),
+        "ops_per_s": round(total / elapsed, 1),
+        "lock_errors": errors[0],
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite 동시 읽기/쓰기 벤치마크")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=300, help="스레드당 작업 수")
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--seed-rows", type=int, default=200)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = [run(mode, args.threads, args.ops, args.write_ratio, args.seed_rows) for mode in ("legacy", "pooled")]
+    text = json.dumps({"benchmark": "db_concurrency", "results": results}, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
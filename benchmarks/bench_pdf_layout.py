@@ -0,0 +1,94 @@
+"""
+4096토큰 분량 플레이북의 PDF 레이아웃/생성 시간 측정.
+
+실행 (프로젝트 루트, font/NanumGothic.ttf 필요):
+    python -m benchmarks.bench_pdf_layout --repeat 5 --out bench_pdf_layout.json
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+import pdf_reporter
+from llm_client import estimate_tokens
+
+_PHRASES = [
+    "[보안 담당자] 랜섬웨어 감염 단말 격리 및 EDR 정책 강화",
+    "[IT 담당자] AWS IAM 루트 계정 MFA 적용 및 액세스 키 교체",
+    "CVE-2024-3400 패치 적용 여부를 자산 목록 기준으로 점검",
+    "검증: SIEM에서 최근 7일 실패 로그인 100건 이상 계정 0건",
+    "Apply vendor hotfix for Ivanti Connect Secure and rotate credentials",
+    "참고: https://www.boannews.com/media/view.asp?idx=131072&kind=1&search=title",
+    "S3 버킷 퍼블릭 액세스 차단 및 CloudTrail 로그 무결성 검증 활성화",
+]
+_SECTIONS = ["상황요약", "긴급", "단기", "중장기", "탐지룰/모니터링", "커뮤니케이션", "체크리스트"]
+
+
+def synthetic_playbook(target_tokens: int = 4096, seed: int = 0) -> str:
+    """결정적(시드 고정) 마크다운 플레이북 생성"""
+    rng = random.Random(seed)
+    lines, n = [], 0
+    while estimate_tokens("\n".join(lines)) < target_tokens:
+        section = _SECTIONS[n % len(_SECTIONS)]
+        lines.append(f"## {n % len(_SECTIONS) + 1}) {section}")
+        for i in range(rng.randint(4, 8)):
+            text = " ".join(rng.choice(_PHRASES) for _ in range(rng.randint(1, 3)))
+            indent = "  " if rng.random() < 0.2 else ""
+            marker = f"{i + 1}." if section == "체크리스트" else "-"
+            lines.append(f"{indent}{marker} **{text}**" if rng.random() < 0.1 else f"{indent}{marker} {text}")
+        lines.append("")
+        n += 1
+    return "\n".join(lines)
+
+
+def _timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {"min_ms": min(samples), "median_ms": statistics.median(samples), "max_ms": max(samples)}
+
+
+def _layout_once(playbook: str):
+    return pdf_reporter.layout_markdown(playbook, font_size=12, line_height=7.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF 레이아웃 벤치마크")
+    parser.add_argument("--tokens", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="결과 JSON 저장 경로 (기본: 표준출력)")
+    args = parser.parse_args(argv)
+
+    playbook = synthetic_playbook(args.tokens)
+    if not pdf_reporter.warm_font_registry():
+        print("NanumGothic 폰트를 찾을 수 없습니다. font/NanumGothic.ttf를 확인하세요.", file=sys.stderr)
+        return 1
+
+    pdf_reporter.clear_layout_cache()
+    cold = _timed(lambda: _layout_once(playbook), 1)
+    warm = _timed(lambda: _layout_once(playbook), args.repeat)
+    report = {"summary": "벤치마크", "keywords": [], "playbook": playbook}
+    full = _timed(lambda: pdf_reporter.create_pdf_report(report, "벤치마크"), args.repeat)
+
+    result = {
+        "benchmark": "pdf_layout",
+        "playbook_tokens": estimate_tokens(playbook),
+        "playbook_chars": len(playbook),
+        "pages": _layout_once(playbook).page,
+        "layout_cold": cold,
+        "layout_warm": warm,
+        "create_pdf_report": full,
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+분석 파이프라인 단계별 벤치마크 (합성 보안뉴스 코퍼스, 네트워크/LLM 호출 없음).
+- scrape_parse: 기사 HTML 추출 (news_scraper.parse_article_html)
+- analyze_regex / analyze_ner: ner_analyzer.analyze_risk_with_model (NER은 KOELECTRA_NER_PATH가 있을 때만)
+- score / aggregate: 기사 점수화와 키워드 집계 (start_analysis와 같은 pipeline 함수)
+- prompt_article / prompt_playbook: llm_generator 프롬프트 구성 (응답을 즉시 돌려주는 백엔드 사용)
+- pdf_report: pdf_reporter.create_pdf_report (font/NanumGothic.ttf 필요)
+- db_*: database.py 저장/조회 (임시 DB)
+
+실행:
+    python -m benchmarks.bench_pipeline --scales 100,1000,10000 --out bench_pipeline.json
+    python -m benchmarks.bench_pipeline --scales 1000 --compare bench_pipeline.json --threshold 0.2
+--compare는 기준 결과 대비 median이 threshold(비율) 이상 느려진 단계가 있으면 종료 코드 1을 반환한다.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import database
+import pdf_reporter
+from benchmarks.bench_pdf_layout import synthetic_playbook
+from benchmarks.corpus import generate_articles, render_html
+from llm_backend import LLMBackend, LLMResponse
+from llm_generator import generate_article_summary, generate_playbook_with_llm
+from ner_analyzer import analyze_risk_with_model, load_ner_model
+from news_scraper import parse_article_html
+from pipeline import score_articles, aggregate_keywords, build_profile, company_info, make_result, snapshot_hash
+from risk_map import get_risk_map
+
+_QUERIES = ["랜섬웨어", "APT", "클라우드", "취약점 패치", "개인정보", "피싱", "CVE", "공급망"]
+
+
+class _PromptOnlyBackend(LLMBackend):
+    """프롬프트만 받고 빈 응답을 즉시 돌려준다 (프롬프트 구성 비용만 측정)"""
+    name = "bench"
+
+    def __init__(self):
+        self.prompt_chars = 0
+
+    def generate_content(self, prompt: str):
+        self.prompt_chars += len(prompt)
+        return LLMResponse("[]")
+
+
+def _measure(fn, repeat: int, items: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    median = statistics.median(samples)
+    stats = {
+        "items": items,
+        "repeat": repeat,
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(median, 3),
+        "max_ms": round(max(samples), 3),
+        "per_item_us": round(median * 1000.0 / items, 2) if items else None,
+    }
+    return stats, result
+
+
+def run_scale(n: int, industry: str, repeat: int, seed: int, ner_limit: int, ner=None):
+    """규모 n 코퍼스로 전 단계를 측정. 반환: {단계: 통계}"""
+    results = {}
+    articles = generate_articles(n, seed)
+    pages = [render_html(a) for a in articles]
+    profile = build_profile({"industry_type": industry})
+
+    results["scrape_parse"], parsed = _measure(
+        lambda: [parse_article_html(page, art["url"]) for page, art in zip(pages, articles)], repeat, n)
+    texts = [f"{a['title']} {a['content']}" for a in parsed]
+
+    results["analyze_regex"], _ = _measure(lambda: [analyze_risk_with_model(t, industry) for t in texts], repeat, n)
+    if ner and ner[0] is not None:
+        subset = texts[:ner_limit]
+        results["analyze_ner"], _ = _measure(
+            lambda: [analyze_risk_with_model(t, industry, *ner) for t in subset], 1, len(subset))
+    else:
+        results["analyze_ner"] = {"skipped": "KOELECTRA_NER_PATH 미설정 또는 모델 로드 실패"}
+
+    results["score"], news_data = _measure(lambda: score_articles(parsed, industry), repeat, n)
+    results["aggregate"], risk_keywords = _measure(
+        lambda: aggregate_keywords(news_data, industry, "랜섬웨어, 클라우드"), repeat, n)
+
+    backend = _PromptOnlyBackend()
+    info = company_info(profile)
+    weights = dict(get_risk_map().weights(industry))
+    results["prompt_article"], _ = _measure(
+        lambda: [generate_article_summary(nd["title"], nd["full_content"], nd["risk_level"], info,
+                                          profile["infrastructure"], backend, weights) for nd in news_data],
+        repeat, n)
+    keywords = [k["keyword"] for k in risk_keywords]
+    scores = {k["keyword"]: k["frequency"] * weights.get(k["keyword"], 0.5) for k in risk_keywords}
+    results["prompt_playbook"], _ = _measure(
+        lambda: generate_playbook_with_llm(keywords, info, profile["infrastructure"], "", backend,
+                                           news_briefs=[nd["title"] for nd in news_data], keyword_scores=scores),
+        repeat, 1)
+
+    if pdf_reporter.warm_font_registry():
+        report = {"summary": f"총 {n}개 뉴스 분석 완료.", "keywords": risk_keywords[:30], "playbook": synthetic_playbook()}
+        results["pdf_report"], _ = _measure(lambda: pdf_reporter.create_pdf_report(report, "벤치마크"), repeat, 1)
+    else:
+        results["pdf_report"] = {"skipped": "font/NanumGothic.ttf 없음"}
+
+    results.update(_run_db(news_data, risk_keywords, profile, parsed, repeat))
+    return results
+
+
+def _run_db(news_data, risk_keywords, profile, articles, repeat: int):
+    """임시 DB에서 즐겨찾기/검색/실행 기록/추이 조회 측정"""
+    results = {}
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    previous_path = database.get_db_path()
+    try:
+        database.set_db_path(path)
+        database.init_db()
+        n = len(news_data)
+
+        def save_favorites():
+            for nd in news_data:
+                database.save_news_to_favorites(nd)
+        results["db_save_favorites"], _ = _measure(save_favorites, 1, n)
+
+        def walk_pages():
+            cursor, pages = None, 0
+            while True:
+                rows, cursor = database.get_saved_news_page(cursor=cursor)
+                pages += 1
+                if cursor is None:
+                    return pages
+        results["db_page_walk"], _ = _measure(walk_pages, repeat, n)
+        results["db_search"], _ = _measure(
+            lambda: [database.search_saved_news(q) for q in _QUERIES], repeat, len(_QUERIES))
+        results["db_keyword_counts"], _ = _measure(lambda: database.get_keyword_counts(), repeat, n)
+
+        run = make_result(profile, news_data, risk_keywords,
+                          {"playbook": "", "selected_keywords": [], "mode": "full", "delta": None, "error": None}, "", {})
+        results["db_save_run"], run_id = _measure(
+            lambda: database.save_analysis_run(run, "bench", snapshot_hash(articles)), 1, n)
+        results["db_get_run"], _ = _measure(lambda: database.get_run(run_id), repeat, n)
+        results["db_keyword_trend"], _ = _measure(
+            lambda: database.get_keyword_trend(profile["industry_type"], "daily", 3650), repeat, 1)
+    finally:
+        database.close_connection()
+        database.set_db_path(previous_path)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    return results
+
+
+def _git_commit():
+    try:
+        repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta_ms: float = 1.0):
+    """단계별 median 비교. 차이가 min_delta_ms 미만이면 측정 잡음으로 보고 회귀에서 제외. 반환: (출력 줄 목록, 회귀 단계 목록)"""
+    lines, regressions = [], []
+    for scale, stages in current["scales"].items():
+        base_stages = baseline.get("scales", {}).get(scale)
+        if not base_stages:
+            continue
+        for stage, stats in stages.items():
+            base = base_stages.get(stage) or {}
+            if "median_ms" not in stats or not base.get("median_ms"):
+                continue
+            ratio = stats["median_ms"] / base["median_ms"]
+            flag = ""
+            if ratio > 1 + threshold and stats["median_ms"] - base["median_ms"] >= min_delta_ms:
+                flag = "  ← 회귀"
+                regressions.append(f"{scale}/{stage}")
+            lines.append(f"{scale:>6} {stage:<18} {base['median_ms']:>10.2f} → {stats['median_ms']:>10.2f} ms  ({ratio:5.2f}x){flag}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 파이프라인 단계별 벤치마크")
+    parser.add_argument("--scales", default="100,1000,10000", help="기사 수 목록 (쉼표 구분)")
+    parser.add_argument("--industry", default="IT/소프트웨어")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ner-limit", type=int, default=200, help="NER 측정에 쓸 최대 기사 수")
+    parser.add_argument("--out", help="결과 JSON 저장 경로 (기본: 표준출력)")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 판단할 median 증가 비율")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="이보다 작은 median 차이는 회귀로 보지 않음")
+    args = parser.parse_args(argv)
+
+    ner = load_ner_model()
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    report = {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "industry": args.industry,
+        "risk_map_version": get_risk_map().version,
+        "scales": {},
+    }
+    for n in scales:
+        print(f"[{n}건] 측정 중...", file=sys.stderr)
+        report["scales"][str(n)] = run_scale(n, args.industry, args.repeat, args.seed, args.ner_limit, ner)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        print(f"기준: {baseline.get('commit')} → 현재: {report['commit']}", file=sys.stderr)
+        for line in lines:
+            print(line, file=sys.stderr)
+        if regressions:
+            print(f"회귀 {len(regressions)}건: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+보안뉴스 형식의 합성 기사 코퍼스 (시드 고정, 네트워크 없음).
+기사 dict는 news_scraper.parse_article_html 결과와 같은 형식이고,
+render_html은 보안뉴스 상세 페이지 구조(#news_title02, #news_util01, #news_content)를 흉내 낸다.
+
+    from benchmarks.corpus import generate_articles
+    articles = generate_articles(1000)
+"""
+import html
+import random
+from datetime import date, timedelta
+
+from risk_map import get_risk_map
+
+_SUBJECTS = ["국내 제조업체", "중견 금융사", "대학병원", "지자체 교육청", "클라우드 서비스 업체", "보안업체 연구팀",
+             "KISA", "과학기술정보통신부", "글로벌 IT 기업", "온라인 쇼핑몰", "물류 기업", "스타트업"]
+_OBJECTS = ["고객 정보", "내부 시스템", "VPN 장비", "이메일 계정", "ERP 서버", "원격 접속 솔루션", "공급망",
+            "생산 설비", "결제 시스템", "학사 정보 시스템", "전자의무기록", "관리자 계정"]
+_VERBS = ["노린 공격이 확인됐다", "관련 피해를 공개했다", "대응 방안을 발표했다", "보안 패치를 배포했다",
+          "주의를 당부했다", "침해 정황을 조사 중이다", "탐지 규칙을 업데이트했다", "모의훈련을 실시했다"]
+_FILLER = ["업계 관계자는 신속한 대응이 중요하다고 말했다.", "자세한 내용은 보고서를 통해 확인할 수 있다.",
+           "전문가들은 기본 보안 수칙 준수를 강조했다.", "피해 규모는 아직 집계되지 않았다.",
+           "회사 측은 추가 피해는 없다고 밝혔다.", "관련 기관은 유사 사례가 늘고 있다고 설명했다."]
+_TAGS = ["SECURITY", "IT", "SAFETY", "사건ㆍ사고", "공공ㆍ정책", "비즈니스", "국제", "테크"]
+
+
+def _sentence(rng: random.Random, keywords) -> str:
+    if keywords and rng.random() < 0.6:
+        kw = rng.choice(keywords)
+        return f"{rng.choice(_SUBJECTS)}의 {rng.choice(_OBJECTS)}을 {kw} 수법으로 {rng.choice(_VERBS)}."
+    return rng.choice(_FILLER)
+
+
+def generate_articles(n: int, seed: int = 0, paragraphs=(3, 8), start: date = date(2024, 1, 1)):
+    """합성 기사 n건. 같은 (n, seed)면 항상 같은 결과"""
+    rng = random.Random(seed)
+    keywords = list(get_risk_map().keywords)
+    articles = []
+    for i in range(n):
+        headline_kw = rng.choice(keywords)
+        day = start + timedelta(days=i * 90 // max(n, 1))
+        body = []
+        for _ in range(rng.randint(*paragraphs)):
+            body.append(" ".join(_sentence(rng, keywords) for _ in range(rng.randint(2, 5))))
+        articles.append({
+            "url": f"https://www.boannews.com/media/view.asp?idx={100000 + i}&kind=1",
+            "title": f"[{rng.choice(_TAGS)}] {rng.choice(_SUBJECTS)}, {headline_kw} {rng.choice(_VERBS)}",
+            "date": f"입력 : {day:%Y-%m-%d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "content": "\n".join(body),
+            "source": rng.choice(_TAGS),
+        })
+    return articles
+
+
+def render_html(article: dict) -> str:
+    """보안뉴스 상세 페이지와 비슷한 HTML (메뉴/광고/관련기사 등 잡음 포함)"""
+    paragraphs = "".join(f"<p>{html.escape(p)}</p><br>" for p in article["content"].split("\n"))
+    nav = "".join(f'<li><a href="/media/list.asp?kind={k}">{html.escape(t)}</a></li>' for k, t in enumerate(_TAGS))
+    related = "".join(f'<li><a href="/media/view.asp?idx={k}">관련 기사 {k}</a></li>' for k in range(10))
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>{html.escape(article["title"])} - 보안뉴스</title>
+<script>var ad = "banner";</script><link rel="stylesheet" href="/css/news.css"></head>
+<body><div id="header"><ul class="gnb">{nav}</ul></div>
+<div id="container"><div id="news_area">
+<div id="news_title02"><h1>{html.escape(article["title"])}</h1></div>
+<div id="news_util01">{html.escape(article["date"])}</div>
+<div id="news_content">{paragraphs}<div class="ad"><img src="/ad.gif" alt="광고"></div></div>
+<div class="related"><ul>{related}</ul></div>
+</div></div><div id="footer">Copyright 보안뉴스 All Rights Reserved.</div></body></html>"""
@@ -0,0 +1,183 @@
+"""
+Streamlit 없이 분석 파이프라인을 실행하는 CLI (야간 배치/cron용).
+
+프로필 JSON 예:
+    {"company_name": "A사", "company_size": "소규모 (10-50명)", "industry_type": "금융업",
+     "infrastructure": "AWS", "constraints": "저예산", "user_interest": "랜섬웨어, 피싱"}
+
+실행:
+    python -m cli run --profile profile.json --out results/
+    python -m cli run-many --profiles clients.jsonl --out results/ --workers 8
+    LLM_BACKEND=stub python -m cli run --profile profile.json --out results/ --no-pdf
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from llm_telemetry import start_run, finish_run
+from tracing import start_trace, finish_trace
+from pdf_batch import safe_filename
+from pdf_reporter import create_pdf_report
+from pipeline import run_pipeline, run_many, report_payload, save_run
+from resources import get_llm_client, get_ner_model, ensure_cisa_keywords, ensure_db
+
+
+def load_profile(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_profiles(path: str) -> list:
+    """프로필 목록 로드: JSON 배열 파일 또는 JSONL (한 줄에 프로필 1개)"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def write_json(result: dict, path: str):
+    """결과 dict를 JSON 파일로 저장"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def output_base(result: dict, out_dir: str) -> str:
+    """결과 파일 경로의 공통 부분 (확장자 제외). out_dir이 없으면 만든다"""
+    os.makedirs(out_dir, exist_ok=True)
+    return os.path.join(out_dir, f"{safe_filename(result['profile']['company_name'])}_{time.strftime('%Y%m%d_%H%M%S')}")
+
+
+def write_pdf(result: dict, base: str):
+    """PDF 보고서 저장. 반환: 경로 (실패 시 None)"""
+    try:
+        pdf = create_pdf_report(report_payload(result), result["profile"]["company_name"])
+        pdf_path = base + ".pdf"
+        with open(pdf_path, "wb") as f:
+            f.write(pdf)
+        return pdf_path
+    except Exception as e:
+        print(f"PDF 생성 실패: {e}")
+        return None
+
+
+def write_outputs(result: dict, out_dir: str, with_pdf: bool = True) -> dict:
+    """결과 JSON(+PDF)을 out_dir에 저장. 반환: {"json": 경로, "pdf": 경로 또는 None}"""
+    base = output_base(result, out_dir)
+    write_json(result, base + ".json")
+    pdf_path = write_pdf(result, base) if with_pdf else None
+    return {"json": base + ".json", "pdf": pdf_path}
+
+
+def cmd_run(args) -> int:
+    profile = load_profile(args.profile)
+    ensure_db()
+    ensure_cisa_keywords()
+    telemetry_run = start_run()
+    trace = start_trace(profile=True if args.cprofile else None)
+    # 실행 기록 저장과 PDF 생성까지 trace에 담고, 예외가 나도 telemetry/trace/프로파일러를 정리한다.
+    # 예외는 그대로 전파되므로 아래 JSON 저장은 성공한 경우에만 실행된다
+    telemetry = None
+    try:
+        result = run_pipeline(profile, get_llm_client(), get_ner_model())
+        result["llm_telemetry"] = telemetry = finish_run(telemetry_run)
+        result["run_id"] = save_run(result)
+        base = output_base(result, args.out)
+        if not args.no_pdf:
+            write_pdf(result, base)
+    finally:
+        if telemetry is None:
+            finish_run(telemetry_run)
+        summary = finish_trace(trace)
+    # 결과 JSON은 trace를 마감한 뒤 한 번만 쓴다
+    result["trace"] = summary
+    json_path = base + ".json"
+    write_json(result, json_path)
+
+    print(f"{result['profile']['company_name']}: 뉴스 {len(result['news_data'])}건, 플레이북 {result['playbook_mode']} → {json_path}")
+    if result["playbook_error"]:
+        print(f"플레이북 경고: {result['playbook_error']}")
+    return 1 if result["playbook_mode"] == "error" else 0
+
+
+def cmd_run_many(args) -> int:
+    profiles = load_profiles(args.profiles)
+    ensure_db()
+    ensure_cisa_keywords()
+    started = time.perf_counter()
+    entries = []
+
+    def on_result(index, result):
+        # 프로필별 결과는 완료되는 대로 저장. 실패한 프로필은 manifest에 오류로 남기고 계속 진행
+        profile = result["profile"]
+        entry = {
+            "index": index,
+            "company_name": profile.get("company_name"),
+            "industry_type": profile.get("industry_type"),
+        }
+        error = result.get("error")
+        if error is None:
+            try:
+                paths = write_outputs(result, args.out, with_pdf=not args.no_pdf)
+            except Exception as e:
+                error = f"결과 저장 실패: {e}"
+        if error is not None:
+            entry.update({"status": "error", "error": error, "run_id": result.get("run_id")})
+        else:
+            entry.update({
+                "status": "ok",
+                "playbook_mode": result["playbook_mode"],
+                "error": result["playbook_error"],
+                "timings_ms": result["timings_ms"],
+                "llm_calls": result["llm_telemetry"]["calls"],
+                "run_id": result.get("run_id"),
+                **paths,
+            })
+        entries.append(entry)
+        status = f"플레이북 {result['playbook_mode']}" if error is None else f"실패 ({error})"
+        print(f"[{len(entries)}/{len(profiles)}] {profile.get('company_name')}: {status}")
+
+    _, shared_timings = run_many(profiles, get_llm_client(), get_ner_model(), workers=args.workers, on_result=on_result)
+    entries.sort(key=lambda e: e["index"])
+    manifest = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "profiles": len(profiles),
+        "succeeded": sum(1 for e in entries if e["status"] == "ok"),
+        "failed": sum(1 for e in entries if e["status"] != "ok"),
+        "shared_timings_ms": shared_timings,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        "results": entries,
+    }
+    with open(os.path.join(args.out, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    failed = sum(1 for e in entries if e["status"] != "ok")
+    print(f"{len(profiles)}개 프로필 완료, 실패 {failed}건 ({manifest['elapsed_ms'] / 1000:.1f}초) → {args.out}")
+    return 1 if failed or any(e.get("playbook_mode") == "error" for e in entries) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="중소기업 보안 위협 분석 파이프라인 (헤드리스)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="프로필 1개 분석 후 JSON/PDF 저장")
+    p_run.add_argument("--profile", required=True, help="기업 프로필 JSON 파일")
+    p_run.add_argument("--out", required=True, help="결과 디렉터리")
+    p_run.add_argument("--no-pdf", action="store_true", help="PDF 생략")
+    p_run.add_argument("--cprofile", action="store_true", help="cProfile 상위 함수를 결과 JSON의 trace에 포함")
+    p_run.set_defaults(func=cmd_run)
+
+    p_many = sub.add_parser("run-many", help="여러 프로필을 수집/추출 1회로 일괄 분석")
+    p_many.add_argument("--profiles", required=True, help="프로필 JSON 배열 또는 JSONL 파일")
+    p_many.add_argument("--out", required=True, help="결과 디렉터리")
+    p_many.add_argument("--workers", type=int, default=4, help="동시에 처리할 프로필 수 (기본: 4)")
+    p_many.add_argument("--no-pdf", action="store_true", help="PDF 생략")
+    p_many.set_defaults(func=cmd_run_many)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
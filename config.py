@@ -6,14 +6,78 @@ load_dotenv()
 
 # LLM 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash")
 GENERATION_CONFIG = {
     "temperature": 0.5,
     "max_output_tokens": 4096,
 }
 
+# LLM 호출 한도 (Gemini 요금제에 맞춰 .env로 조정)
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "15"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_DAILY_REQUEST_LIMIT = int(os.getenv("LLM_DAILY_REQUEST_LIMIT", "1500"))
+LLM_DAILY_TOKEN_BUDGET = int(os.getenv("LLM_DAILY_TOKEN_BUDGET", "2000000"))
+LLM_BUDGET_SAFETY_RATIO = float(os.getenv("LLM_BUDGET_SAFETY_RATIO", "0.9"))  # 하드 한도 도달 전 차단 비율
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SEC = 1.0
+LLM_BACKOFF_MAX_SEC = 32.0
+LLM_RATE_LIMIT_WAIT_SEC = 60
+LLM_RESPONSE_CACHE_SIZE = 256
+LLM_RESPONSE_CACHE_TTL_SEC = int(os.getenv("LLM_RESPONSE_CACHE_TTL_SEC", "600"))  # 동일 프롬프트 재사용 시간
+
+# 프롬프트 컨텍스트 토큰 예산 (근사 토큰 수 기준)
+PROMPT_TOKEN_BUDGETS = {
+    "article_content": int(os.getenv("PROMPT_BUDGET_ARTICLE", "1500")),
+    "playbook_keywords": int(os.getenv("PROMPT_BUDGET_PLAYBOOK_KEYWORDS", "200")),
+    "playbook_news": int(os.getenv("PROMPT_BUDGET_PLAYBOOK_NEWS", "400")),
+    "keyword_candidates": int(os.getenv("PROMPT_BUDGET_KEYWORD_CANDIDATES", "400")),
+}
+
+# 증분 플레이북: 상위 N개 키워드 비교, 변화 비율이 이보다 크면 전체 재생성
+INCREMENTAL_TOP_N = 12
+INCREMENTAL_MAX_DELTA_RATIO = float(os.getenv("INCREMENTAL_MAX_DELTA_RATIO", "0.5"))
+
+# LLM 백엔드 선택: "gemini" 또는 "stub"(오프라인 부하 테스트용)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").strip().lower()
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "300"))
+STUB_TOKENS_PER_SEC = float(os.getenv("STUB_TOKENS_PER_SEC", "0"))
+STUB_FAILURE_RATE = float(os.getenv("STUB_FAILURE_RATE", "0"))
+STUB_FAILURE_STATUS = int(os.getenv("STUB_FAILURE_STATUS", "503"))
+STUB_SEED = int(os.getenv("STUB_SEED", "0"))
+
 # NER 모델 설정
 KOELECTRA_NER_PATH = os.getenv("KOELECTRA_NER_PATH", "").strip()
 
+# 대시보드 동향 요약용 RSS
+DASHBOARD_RSS_URL = "http://www.boannews.com/media/news_rss.xml?skind=5"
+
+# 성능 트레이싱: 분석 실행 중 cProfile을 켤 비율 (0~1, 기본 꺼짐)과 기록할 상위 함수 수
+TRACE_PROFILE_SAMPLE_RATE = float(os.getenv("TRACE_PROFILE_SAMPLE_RATE", "0"))
+TRACE_PROFILE_TOP_N = 25
+
+# 업종별 위험도 맵 파일 (수정하면 RISK_MAP_CHECK_SEC 안에 자동 반영)
+RISK_MAP_PATH = os.getenv("RISK_MAP_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "industry_risk_map.json"))
+RISK_MAP_CHECK_SEC = float(os.getenv("RISK_MAP_CHECK_SEC", "5"))
+
+# CISA KEV 키워드 갱신 주기 (성공 후 재다운로드 간격 / 실패 후 재시도 간격)
+CISA_KEV_REFRESH_SEC = int(os.getenv("CISA_KEV_REFRESH_SEC", str(6 * 3600)))
+CISA_KEV_RETRY_SEC = 600
+
+# SQLite 설정
+DB_PATH = os.getenv("BOOKMARKS_DB_PATH", "bookmarks.db")
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()  # WAL에서는 NORMAL로도 커밋 손상 없음
+DB_STATEMENT_CACHE_SIZE = 128
+
+# 세션 시작 시 같은 프로필의 최근 분석 결과를 불러오는 최대 경과 시간
+RUN_REUSE_MAX_AGE_HOURS = float(os.getenv("RUN_REUSE_MAX_AGE_HOURS", "12"))
+
+# 기사 본문 LRU 캐시 크기 (프로세스 전역, 모든 세션이 공유)
+ARTICLE_CACHE_SIZE = int(os.getenv("ARTICLE_CACHE_SIZE", "256"))
+
+# PDF 보고서 메모이즈 개수 (프로세스 전역)
+PDF_CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", "32"))
+
 # 페이지 설정
 PAGE_CONFIG = {
     "page_title": "중소기업 보안 관심/위험 분석 시스템",
@@ -123,4 +187,8 @@ INDUSTRY_OPTIONS = ["IT/소프트웨어", "제조업", "금융업", "의료업",
 INFRASTRUCTURE_OPTIONS = ["AWS", "Azure", "GCP", "On-premise", "Hybrid"]
 
 # 페이지네이션 설정
-PAGE_SIZE = 10
\ No newline at end of file
+PAGE_SIZE = 10
+
+# 대시보드 키워드 추이 (조회 기간, 표시할 상위 키워드 수)
+TREND_DAYS = int(os.getenv("TREND_DAYS", "30"))
+TREND_TOP_KEYWORDS = 5
\ No newline at end of file
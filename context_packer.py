@@ -0,0 +1,90 @@
+import re
+from llm_client import estimate_tokens
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?。])\s+|\n+')
+
+
+def count_tokens(text: str) -> int:
+    """Gemini 토크나이저 기준 근사 토큰 수 (네트워크 호출 없음)"""
+    return estimate_tokens(text)
+
+
+def split_sentences(text: str):
+    """마침표/물음표/느낌표 뒤 공백과 줄바꿈을 기준으로 문장 분리"""
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if s.strip()]
+
+
+def score_text(text: str, keyword_weights: dict) -> float:
+    """텍스트에 포함된 키워드의 위험 가중치 합"""
+    lowered = text.lower()
+    return sum(w for kw, w in keyword_weights.items() if kw and kw.lower() in lowered)
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """토큰 예산 안에 드는 가장 긴 앞부분 (토큰 수는 길이에 단조 증가하므로 이분 탐색)"""
+    if count_tokens(text) <= budget:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip()
+
+
+def pack_sentences(text: str, keyword_weights: dict, budget: int) -> str:
+    """
+    토큰 예산 안에서 위험 키워드가 많이 등장하는 문장을 우선 선택.
+    - 점수 동률이면 앞쪽 문장 우선 (첫 문장은 리드로 가산점)
+    - 선택된 문장은 원문 순서대로 다시 이어 붙인다
+    - 최상위 문장 하나가 예산을 넘으면(문장 구분 없는 긴 본문 등) 그 앞부분만 잘라 쓴다
+    """
+    sentences = split_sentences(text)
+    if count_tokens(text) <= budget:
+        return " ".join(sentences)
+
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (-(score_text(sentences[i], keyword_weights) + (0.5 if i == 0 else 0.0)), i),
+    )
+    if not ranked or budget <= 0:
+        return ""
+    top = sentences[ranked[0]]
+    if count_tokens(top) + 1 > budget:
+        return truncate_to_tokens(top, budget - 1)
+    chosen, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(sentences[i]) + 1
+        if used + cost > budget:
+            continue
+        chosen.add(i)
+        used += cost
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def pack_keywords(keywords, budget: int, keyword_scores: dict = None, sep: str = ", "):
+    """점수(빈도 × 업종 가중치) 내림차순으로 토큰 예산을 채울 때까지 키워드 선택"""
+    if keyword_scores:
+        keywords = sorted(keywords, key=lambda k: -keyword_scores.get(k, 0.0))
+    packed, used, sep_cost = [], 0, count_tokens(sep)
+    for kw in keywords:
+        cost = count_tokens(kw) + sep_cost
+        if used + cost > budget:
+            continue
+        packed.append(kw)
+        used += cost
+    return packed
+
+
+def pack_lines(lines, budget: int):
+    """이미 순위가 매겨진 줄 목록을 예산 안에서 앞에서부터 채운다."""
+    packed, used = [], 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        packed.append(line)
+        used += cost
+    return packed
@@ -1,11 +1,92 @@
+import re
 import sqlite3
 import json
-from datetime import datetime
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from tracing import traced
+from config import DB_PATH, DB_BUSY_TIMEOUT_MS, DB_SYNCHRONOUS, DB_STATEMENT_CACHE_SIZE, PAGE_SIZE
 
+_db_path = DB_PATH
+_local = threading.local()
+
+def set_db_path(path):
+    """DB 파일 경로 변경 (벤치마크/일괄 작업용). 이후 새로 여는 연결부터 적용"""
+    global _db_path
+    _db_path = path
+
+def get_db_path():
+    """현재 DB 파일 경로"""
+    return _db_path
+
+def get_connection():
+    """
+    스레드별 영속 연결 반환.
+    WAL 저널(읽기/쓰기 동시 진행), synchronous 튜닝, busy_timeout, 구문 캐시를 적용한다.
+    외래 키 검사는 SQLite 기본값이 꺼짐이라 연결마다 켜야 ON DELETE CASCADE가 동작한다.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(_db_path)
+    if conn is None:
+        conn = sqlite3.connect(_db_path, timeout=DB_BUSY_TIMEOUT_MS / 1000.0, cached_statements=DB_STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conns[_db_path] = conn
+    return conn
+
+def close_connection():
+    """현재 스레드의 연결 종료"""
+    conns = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
+
+@contextmanager
+def transaction():
+    """쓰기 트랜잭션: 정상 종료 시 commit, 예외 시 rollback"""
+    conn = get_connection()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+@traced("db.init")
 def init_db():
-    """데이터베이스 초기화 및 테이블 생성"""
-    conn = sqlite3.connect('bookmarks.db')
-    c = conn.cursor()
+    """데이터베이스 초기화: 아직 적용되지 않은 스키마 마이그레이션을 순서대로 적용"""
+    conn = get_connection()
+    with transaction():
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    current = get_schema_version()
+    for version, name, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        # 마이그레이션 하나 = 트랜잭션 하나. 실패하면 다음 실행 때 해당 버전부터 다시 시도
+        with transaction():
+            conn.execute("BEGIN")  # DDL도 같은 트랜잭션에 포함 (sqlite3 모듈은 DML 앞에서만 자동 BEGIN)
+            migrate(conn.cursor())
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+    _fts_by_path.pop(_db_path, None)
+
+def get_schema_version():
+    """현재 적용된 스키마 버전 (마이그레이션 전이면 0)"""
+    row = get_connection().execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+# 마이그레이션 1: 기본 테이블 (IF NOT EXISTS라 버전 관리 이전의 DB에도 안전하게 적용)
+def _migrate_base_tables(c):
     c.execute('''
         CREATE TABLE IF NOT EXISTS saved_news (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -28,84 +109,764 @@ def init_db():
             saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    conn.commit()
-    conn.close()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS llm_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            label TEXT,
+            started_at TIMESTAMP,
+            latency_ms REAL,
+            ttft_ms REAL,
+            prompt_tokens INTEGER,
+            output_tokens INTEGER,
+            retries INTEGER,
+            cache_hit INTEGER,
+            status TEXT,
+            error TEXT
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_started_at ON llm_calls(started_at)")
+
+# 마이그레이션 2: 즐겨찾기 키셋 페이지용 인덱스
+def _migrate_saved_at_indexes(c):
+    c.execute("CREATE INDEX IF NOT EXISTS idx_saved_news_saved_at ON saved_news(saved_at, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_saved_playbooks_saved_at ON saved_playbooks(saved_at, id)")
 
+# 마이그레이션 3: FTS5 전문 검색 인덱스 (external content + 동기화 트리거).
+# trigram 토크나이저는 띄어쓰기/조사와 무관하게 한글 부분 문자열을 찾는다. 단, 3글자 이상 검색어만 가능
+_FTS_TABLES = {
+    "saved_news_fts": ("saved_news", ("title", "summary", "keywords")),
+    "saved_playbooks_fts": ("saved_playbooks", ("title", "summary", "playbook_content")),
+}
+_fts_by_path = {}  # DB 경로 → FTS 인덱스 존재 여부 (DB마다 SQLite 지원 여부가 다를 수 있음)
+
+def _fts_available():
+    """현재 DB에 FTS 인덱스가 있는지 (경로별로 한 번만 sqlite_master 조회)"""
+    available = _fts_by_path.get(_db_path)
+    if available is None:
+        conn = get_connection()
+        available = _fts_by_path[_db_path] = all(
+            conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fts,)).fetchone()
+            for fts in _FTS_TABLES
+        )
+    return available
+
+def _create_fts(c):
+    for fts, (table, columns) in _FTS_TABLES.items():
+        exists = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fts,)).fetchone()
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{col}" for col in columns)
+        old_cols = ", ".join(f"old.{col}" for col in columns)
+        try:
+            c.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id', tokenize='trigram')")
+        except sqlite3.OperationalError as e:
+            # FTS5/trigram 미지원 SQLite (3.34 미만) → LIKE 검색으로 대체
+            print(f"FTS5 인덱스 생성 실패, LIKE 검색을 사용합니다: {e}")
+            return
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        """)
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            END
+        """)
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        """)
+        if not exists:
+            # 인덱스 도입 이전에 저장된 행까지 색인
+            c.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+# 마이그레이션 4: 키워드 정규화 테이블 + 기존 JSON 컬럼에서 백필
+# keywords(JSON) 컬럼은 화면 표시용으로 유지하고, 집계는 링크 테이블로 한다.
+def _migrate_keyword_tables(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS keywords (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword TEXT NOT NULL UNIQUE
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS news_keywords (
+            news_id INTEGER NOT NULL REFERENCES saved_news(id) ON DELETE CASCADE,
+            keyword_id INTEGER NOT NULL REFERENCES keywords(id) ON DELETE CASCADE,
+            PRIMARY KEY (news_id, keyword_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS playbook_keywords (
+            playbook_id INTEGER NOT NULL REFERENCES saved_playbooks(id) ON DELETE CASCADE,
+            keyword_id INTEGER NOT NULL REFERENCES keywords(id) ON DELETE CASCADE,
+            PRIMARY KEY (playbook_id, keyword_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_news_keywords_keyword ON news_keywords(keyword_id, news_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_playbook_keywords_keyword ON playbook_keywords(keyword_id, playbook_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_saved_news_risk_saved_at ON saved_news(risk_level, saved_at)")
+
+    for table, link_table, fk in (("saved_news", "news_keywords", "news_id"),
+                                  ("saved_playbooks", "playbook_keywords", "playbook_id")):
+        for row_id, raw in c.execute(f"SELECT id, keywords FROM {table}").fetchall():
+            try:
+                keywords = json.loads(raw or "[]")
+            except ValueError:
+                print(f"{table} #{row_id} 키워드 JSON 파싱 실패, 백필 건너뜀")
+                continue
+            _link_keywords(c, link_table, fk, row_id, keywords)
+
+def _link_keywords(c, link_table, fk, row_id, keywords):
+    """키워드 사전에 없으면 추가하고 (row_id, keyword_id) 링크 저장"""
+    keywords = list(dict.fromkeys(str(k).strip() for k in keywords if k and str(k).strip()))
+    if not keywords:
+        return
+    c.executemany("INSERT OR IGNORE INTO keywords (keyword) VALUES (?)", [(k,) for k in keywords])
+    placeholders = ", ".join("?" * len(keywords))
+    c.execute(f'''
+        INSERT OR IGNORE INTO {link_table} ({fk}, keyword_id)
+        SELECT ?, id FROM keywords WHERE keyword IN ({placeholders})
+    ''', [row_id] + keywords)
+
+# 마이그레이션 5: 분석 실행 기록 (프로필 해시 + 수집 스냅샷 해시로 조회)
+def _migrate_analysis_runs(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_hash TEXT NOT NULL,
+            snapshot_hash TEXT NOT NULL,
+            company_name TEXT,
+            industry_type TEXT,
+            profile TEXT,
+            risk_keywords TEXT,
+            playbook_content TEXT,
+            llm_selected_keywords TEXT,
+            playbook_mode TEXT,
+            dashboard_summary TEXT,
+            report_summary TEXT,
+            timings TEXT,
+            llm_telemetry TEXT,
+            article_count INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS run_articles (
+            run_id INTEGER NOT NULL REFERENCES analysis_runs(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            url TEXT,
+            title TEXT,
+            summary TEXT,
+            full_content TEXT,
+            source TEXT,
+            published TEXT,
+            risk_level TEXT,
+            risk_score REAL,
+            keywords TEXT,
+            PRIMARY KEY (run_id, position)
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_analysis_runs_profile ON analysis_runs(profile_hash, snapshot_hash, created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_analysis_runs_created_at ON analysis_runs(created_at)")
+
+# 마이그레이션 6: 기사 본문 공유 저장소. 실행 기록은 article_id만 참조한다.
+def _migrate_articles(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL UNIQUE,
+            title TEXT,
+            source TEXT,
+            published TEXT,
+            content TEXT,
+            content_hash TEXT,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # 기존 실행 기록의 본문을 옮긴다 (같은 url은 가장 최근 실행의 본문 사용)
+    c.execute('''
+        INSERT INTO articles (url, title, source, published, content, content_hash)
+        SELECT url, title, source, published, full_content, NULL
+        FROM run_articles WHERE url IS NOT NULL ORDER BY run_id DESC
+        ON CONFLICT(url) DO NOTHING
+    ''')
+    # 본문 컬럼을 뺀 테이블로 다시 만든다 (ALTER TABLE DROP COLUMN은 SQLite 3.35 이상이라 쓰지 않음)
+    c.execute('''
+        CREATE TABLE run_articles_new (
+            run_id INTEGER NOT NULL REFERENCES analysis_runs(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            article_id INTEGER REFERENCES articles(id),
+            risk_level TEXT,
+            risk_score REAL,
+            keywords TEXT,
+            PRIMARY KEY (run_id, position)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        INSERT INTO run_articles_new (run_id, position, article_id, risk_level, risk_score, keywords)
+        SELECT ra.run_id, ra.position, a.id, ra.risk_level, ra.risk_score, ra.keywords
+        FROM run_articles ra LEFT JOIN articles a ON a.url = ra.url
+    ''')
+    c.execute("DROP TABLE run_articles")
+    c.execute("ALTER TABLE run_articles_new RENAME TO run_articles")
+
+# 마이그레이션 7: 업종별 키워드 추이 롤업 (일별/주별). 분석이 끝날 때마다 누적한다.
+def _migrate_keyword_trends(c):
+    # 같은 기사를 여러 번 분석해도 업종별로 한 번만 집계하기 위한 기록
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS keyword_trend_seen (
+            industry_type TEXT NOT NULL,
+            article_id INTEGER NOT NULL,
+            PRIMARY KEY (industry_type, article_id)
+        ) WITHOUT ROWID
+    ''')
+    for table, bucket in _TREND_TABLES.values():
+        c.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                industry_type TEXT NOT NULL,
+                {bucket} TEXT NOT NULL,
+                keyword_id INTEGER NOT NULL REFERENCES keywords(id),
+                article_count INTEGER NOT NULL,
+                score_sum REAL NOT NULL,
+                PRIMARY KEY (industry_type, {bucket}, keyword_id)
+            ) WITHOUT ROWID
+        ''')
+    # 기존 실행 기록 반영 (게시일을 알 수 없으면 실행일 기준)
+    rows = c.execute('''
+        SELECT r.industry_type, ra.article_id, a.published, ra.risk_score, ra.keywords, date(r.created_at)
+        FROM run_articles ra JOIN analysis_runs r ON r.id = ra.run_id JOIN articles a ON a.id = ra.article_id
+        ORDER BY r.id, ra.position
+    ''').fetchall()
+    by_industry = {}
+    for industry_type, *row in rows:
+        row[3] = json.loads(row[3] or "[]")
+        by_industry.setdefault(industry_type, []).append(row)
+    for industry_type, items in by_industry.items():
+        _rollup_keyword_trends(c, industry_type, items)
+
+# 기간 단위 → (롤업 테이블, 기간 컬럼). 주별 기간은 해당 주 월요일 날짜
+_TREND_TABLES = {
+    "daily": ("keyword_trend_daily", "day"),
+    "weekly": ("keyword_trend_weekly", "week"),
+}
+
+_DATE_RE = re.compile(r"(\d{4})[-./](\d{1,2})[-./](\d{1,2})")
+
+def _trend_day(published, fallback_day):
+    """게시일 문자열('입력 : 2024.05.23 10:20' 등)에서 날짜 추출. 실패하면 fallback_day"""
+    m = _DATE_RE.search(published or "")
+    if m:
+        try:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            pass
+    return date.fromisoformat(fallback_day)
+
+def _rollup_keyword_trends(c, industry_type, items):
+    """
+    items: (article_id, published, risk_score, keywords, fallback_day) 목록.
+    업종에서 처음 보는 기사만 키워드별 기사 수/관심도 점수 합을 일별·주별 롤업에 더한다.
+    """
+    if not industry_type or not items:
+        return
+    # INSERT … RETURNING(SQLite 3.35+) 대신 이미 본 id를 먼저 조회하고 나머지만 기록
+    ids = list({it[0] for it in items if it[0] is not None})
+    seen = set()
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        seen.update(row[0] for row in c.execute(
+            f"SELECT article_id FROM keyword_trend_seen WHERE industry_type = ? AND article_id IN ({', '.join('?' * len(chunk))})",
+            [industry_type] + chunk
+        ))
+    new_ids = set(ids) - seen
+    if not new_ids:
+        return
+    c.executemany("INSERT OR IGNORE INTO keyword_trend_seen (industry_type, article_id) VALUES (?, ?)",
+                  [(industry_type, article_id) for article_id in new_ids])
+    buckets = {"daily": {}, "weekly": {}}
+    keywords = set()
+    for article_id, published, risk_score, kws, fallback_day in items:
+        if article_id not in new_ids:
+            continue
+        new_ids.discard(article_id)  # 한 실행 안의 중복 기사도 1회만
+        day = _trend_day(published, fallback_day)
+        week = day - timedelta(days=day.weekday())
+        for kw in set(str(k).strip() for k in kws if k and str(k).strip()):
+            keywords.add(kw)
+            for period, key in (("daily", day), ("weekly", week)):
+                count, score = buckets[period].get((key, kw), (0, 0.0))
+                buckets[period][(key, kw)] = (count + 1, score + float(risk_score or 0.0))
+    if not keywords:
+        return
+    c.executemany("INSERT OR IGNORE INTO keywords (keyword) VALUES (?)", [(k,) for k in keywords])
+    keyword_ids = dict(c.execute(
+        f"SELECT keyword, id FROM keywords WHERE keyword IN ({', '.join('?' * len(keywords))})", list(keywords)
+    ))
+    for period, counts in buckets.items():
+        table, bucket = _TREND_TABLES[period]
+        c.executemany(f'''
+            INSERT INTO {table} (industry_type, {bucket}, keyword_id, article_count, score_sum)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (industry_type, {bucket}, keyword_id) DO UPDATE SET
+                article_count = article_count + excluded.article_count,
+                score_sum = score_sum + excluded.score_sum
+        ''', [
+            (industry_type, key.isoformat(), keyword_ids[kw], count, score)
+            for (key, kw), (count, score) in counts.items()
+        ])
+
+# 마이그레이션 8: 외래 키 검사가 꺼져 있던 동안 삭제된 부모 행의 고아 링크/기록 정리
+def _migrate_delete_orphans(c):
+    c.execute("DELETE FROM news_keywords WHERE news_id NOT IN (SELECT id FROM saved_news)")
+    c.execute("DELETE FROM playbook_keywords WHERE playbook_id NOT IN (SELECT id FROM saved_playbooks)")
+    for link_table in ("news_keywords", "playbook_keywords"):
+        c.execute(f"DELETE FROM {link_table} WHERE keyword_id NOT IN (SELECT id FROM keywords)")
+    c.execute("DELETE FROM run_articles WHERE run_id NOT IN (SELECT id FROM analysis_runs)")
+    for table, _ in _TREND_TABLES.values():
+        c.execute(f"DELETE FROM {table} WHERE keyword_id NOT IN (SELECT id FROM keywords)")
+
+# (버전, 이름, 적용 함수). 새 스키마 변경은 목록 끝에 추가만 한다 (기존 항목 수정 금지)
+MIGRATIONS = [
+    (1, "base_tables", _migrate_base_tables),
+    (2, "saved_at_indexes", _migrate_saved_at_indexes),
+    (3, "fts_search", _create_fts),
+    (4, "keyword_tables", _migrate_keyword_tables),
+    (5, "analysis_runs", _migrate_analysis_runs),
+    (6, "articles", _migrate_articles),
+    (7, "keyword_trends", _migrate_keyword_trends),
+    (8, "delete_orphans", _migrate_delete_orphans),
+]
+
+@traced("db.save_favorite")
 def save_news_to_favorites(news_item):
     """뉴스 기사를 즐겨찾기에 저장"""
-    conn = sqlite3.connect('bookmarks.db')
-    c = conn.cursor()
     try:
-        c.execute('''
-            INSERT INTO saved_news (title, url, summary, keywords, risk_level, risk_score)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            news_item['title'],
-            news_item['url'],
-            news_item['summary'],
-            json.dumps(news_item['keywords'], ensure_ascii=False),
-            news_item['risk_level'],
-            news_item['risk_score']
-        ))
-        conn.commit()
+        with transaction() as conn:
+            cur = conn.execute('''
+                INSERT INTO saved_news (title, url, summary, keywords, risk_level, risk_score)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                news_item['title'],
+                news_item['url'],
+                news_item['summary'],
+                json.dumps(news_item['keywords'], ensure_ascii=False),
+                news_item['risk_level'],
+                news_item['risk_score']
+            ))
+            _link_keywords(conn, "news_keywords", "news_id", cur.lastrowid, news_item['keywords'])
         return True, f"'{news_item['title']}' 기사를 즐겨찾기에 추가했습니다."
     except sqlite3.IntegrityError:
         return False, f"'{news_item['title']}' 기사는 이미 즐겨찾기에 있습니다."
-    finally:
-        conn.close()
 
 def get_saved_news():
     """저장된 뉴스 기사 목록 조회"""
-    conn = sqlite3.connect('bookmarks.db')
-    c = conn.cursor()
-    c.execute("SELECT * FROM saved_news ORDER BY saved_at DESC")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    return get_connection().execute("SELECT * FROM saved_news ORDER BY saved_at DESC").fetchall()
+
+@traced("db.news_page", items=lambda r: len(r[0]))
+def get_saved_news_page(limit=PAGE_SIZE, cursor=None):
+    """
+    저장된 뉴스 키셋 페이지 조회 (saved_at, id 내림차순).
+    cursor는 이전 페이지가 돌려준 (saved_at, id). 반환: (rows, 다음 페이지 cursor 또는 None)
+    """
+    sql = "SELECT id, title, url, summary, keywords, risk_level, risk_score, saved_at FROM saved_news"
+    params = []
+    if cursor:
+        sql += " WHERE (saved_at, id) < (?, ?)"
+        params.extend(cursor)
+    sql += " ORDER BY saved_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+    rows = get_connection().execute(sql, params).fetchall()
+    return _page(rows, limit, saved_at_index=7)
 
 def delete_news_from_favorites(news_id):
     """즐겨찾기에서 뉴스 기사 삭제"""
-    conn = sqlite3.connect('bookmarks.db')
-    c = conn.cursor()
-    c.execute("DELETE FROM saved_news WHERE id = ?", (news_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM saved_news WHERE id = ?", (news_id,))
 
 def save_playbook_to_favorites(playbook_title, playbook_content, report_summary, llm_selected_keywords):
     """대응 플레이북을 즐겨찾기에 저장"""
-    conn = sqlite3.connect('bookmarks.db')
-    c = conn.cursor()
     try:
         clean_playbook_content = playbook_content.replace('<br>', '\n')
-        c.execute('''
-            INSERT INTO saved_playbooks (title, summary, playbook_content, keywords)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            f"[{datetime.now().strftime('%Y-%m-%d %H:%M')}] {playbook_title}",
-            report_summary,
-            clean_playbook_content,
-            json.dumps([k['keyword'] for k in llm_selected_keywords], ensure_ascii=False)
-        ))
-        conn.commit()
+        keywords = [k['keyword'] for k in llm_selected_keywords]
+        with transaction() as conn:
+            cur = conn.execute('''
+                INSERT INTO saved_playbooks (title, summary, playbook_content, keywords)
+                VALUES (?, ?, ?, ?)
+            ''', (
+                f"[{datetime.now().strftime('%Y-%m-%d %H:%M')}] {playbook_title}",
+                report_summary,
+                clean_playbook_content,
+                json.dumps(keywords, ensure_ascii=False)
+            ))
+            _link_keywords(conn, "playbook_keywords", "playbook_id", cur.lastrowid, keywords)
         return True, "대응 플레이북을 즐겨찾기에 추가했습니다."
     except sqlite3.IntegrityError:
         return False, "플레이북 저장 중 오류가 발생했습니다."
-    finally:
-        conn.close()
 
 def get_saved_playbooks():
     """저장된 플레이북 목록 조회"""
-    conn = sqlite3.connect('bookmarks.db')
-    c = conn.cursor()
-    c.execute("SELECT * FROM saved_playbooks ORDER BY saved_at DESC")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    return get_connection().execute("SELECT * FROM saved_playbooks ORDER BY saved_at DESC").fetchall()
+
+def get_saved_playbooks_page(limit=PAGE_SIZE, cursor=None):
+    """저장된 플레이북 키셋 페이지 조회. 목록용 컬럼만 (본문은 get_playbook_content로 지연 조회)"""
+    sql = "SELECT id, title, summary, keywords, saved_at FROM saved_playbooks"
+    params = []
+    if cursor:
+        sql += " WHERE (saved_at, id) < (?, ?)"
+        params.extend(cursor)
+    sql += " ORDER BY saved_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+    rows = get_connection().execute(sql, params).fetchall()
+    return _page(rows, limit, saved_at_index=4)
+
+def get_playbook_content(playbook_id):
+    """플레이북 본문 1건 조회"""
+    row = get_connection().execute(
+        "SELECT playbook_content FROM saved_playbooks WHERE id = ?", (playbook_id,)
+    ).fetchone()
+    return row[0] if row else None
+
+def _page(rows, limit, saved_at_index):
+    # limit+1개를 읽어 다음 페이지 존재 여부 판단
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, (last[saved_at_index], last[0])
 
 def delete_playbook_from_favorites(playbook_id):
     """즐겨찾기에서 플레이북 삭제"""
-    conn = sqlite3.connect('bookmarks.db')
-    c = conn.cursor()
-    c.execute("DELETE FROM saved_playbooks WHERE id = ?", (playbook_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM saved_playbooks WHERE id = ?", (playbook_id,))
+
+def get_latest_playbook():
+    """가장 최근 저장된 플레이북 (내용, 키워드 목록) 조회. 없으면 None"""
+    row = get_connection().execute(
+        "SELECT playbook_content, keywords FROM saved_playbooks ORDER BY saved_at DESC, id DESC LIMIT 1"
+    ).fetchone()
+    if not row:
+        return None
+    return row[0], json.loads(row[1] or "[]")
+
+def get_keyword_counts(source="news", risk_level=None, since=None, limit=20):
+    """
+    저장된 뉴스(source='news') 또는 플레이북(source='playbooks')의 키워드별 건수 (많은 순).
+    risk_level: 뉴스 관심도 필터 ('높음' 등), since: 'YYYY-MM-DD' 이후 저장분만
+    예) get_keyword_counts(risk_level='높음', since='2024-06-01')
+    반환 행: (keyword, count)
+    """
+    if source == "news":
+        sql = '''
+            SELECT k.keyword, COUNT(*) AS cnt
+            FROM news_keywords l JOIN keywords k ON k.id = l.keyword_id JOIN saved_news t ON t.id = l.news_id
+        '''
+    elif source == "playbooks":
+        if risk_level:
+            raise ValueError("플레이북에는 관심도(risk_level) 필터를 쓸 수 없습니다.")
+        sql = '''
+            SELECT k.keyword, COUNT(*) AS cnt
+            FROM playbook_keywords l JOIN keywords k ON k.id = l.keyword_id JOIN saved_playbooks t ON t.id = l.playbook_id
+        '''
+    else:
+        raise ValueError(f"알 수 없는 source: {source}")
+    clauses, params = [], []
+    if risk_level:
+        clauses.append("t.risk_level = ?")
+        params.append(risk_level)
+    if since:
+        clauses.append("t.saved_at >= ?")
+        params.append(str(since))
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " GROUP BY l.keyword_id ORDER BY cnt DESC, k.keyword LIMIT ?"
+    params.append(limit)
+    return get_connection().execute(sql, params).fetchall()
+
+def _fts_query(query):
+    """사용자 입력을 FTS5 구문으로 변환: 단어마다 큰따옴표로 감싼 AND 검색"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+def _use_fts(query):
+    # trigram은 3글자 미만 검색어를 찾지 못하므로 짧은 검색어는 LIKE로 처리
+    terms = query.split()
+    return terms and all(len(term) >= 3 for term in terms) and _fts_available()
+
+def _like_where(columns, query):
+    clauses, params = [], []
+    for term in query.split():
+        clauses.append("(" + " OR ".join(f"{col} LIKE ?" for col in columns) + ")")
+        params.extend([f"%{term}%"] * len(columns))
+    return " AND ".join(clauses), params
+
+@traced("db.search_news", items=len)
+def search_saved_news(query, limit=PAGE_SIZE):
+    """
+    저장된 뉴스 전문 검색 (제목/요약/키워드).
+    반환 행: (id, title, url, summary, keywords, risk_level, risk_score, saved_at, snippet), 관련도순
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+    conn = get_connection()
+    if _use_fts(query):
+        return conn.execute("""
+            SELECT n.id, n.title, n.url, n.summary, n.keywords, n.risk_level, n.risk_score, n.saved_at,
+                   snippet(saved_news_fts, -1, '<mark>', '</mark>', '…', 24)
+            FROM saved_news_fts JOIN saved_news n ON n.id = saved_news_fts.rowid
+            WHERE saved_news_fts MATCH ?
+            ORDER BY bm25(saved_news_fts, 5.0, 2.0, 3.0)
+            LIMIT ?
+        """, (_fts_query(query), limit)).fetchall()
+    where, params = _like_where(("title", "summary", "keywords"), query)
+    return conn.execute(f"""
+        SELECT id, title, url, summary, keywords, risk_level, risk_score, saved_at, substr(summary, 1, 120)
+        FROM saved_news WHERE {where} ORDER BY saved_at DESC, id DESC LIMIT ?
+    """, params + [limit]).fetchall()
+
+@traced("db.search_playbooks", items=len)
+def search_saved_playbooks(query, limit=PAGE_SIZE):
+    """
+    저장된 플레이북 전문 검색 (제목/요약/본문).
+    반환 행: (id, title, summary, keywords, saved_at, snippet), 관련도순
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+    conn = get_connection()
+    if _use_fts(query):
+        return conn.execute("""
+            SELECT p.id, p.title, p.summary, p.keywords, p.saved_at,
+                   snippet(saved_playbooks_fts, -1, '<mark>', '</mark>', '…', 24)
+            FROM saved_playbooks_fts JOIN saved_playbooks p ON p.id = saved_playbooks_fts.rowid
+            WHERE saved_playbooks_fts MATCH ?
+            ORDER BY bm25(saved_playbooks_fts, 5.0, 3.0, 1.0)
+            LIMIT ?
+        """, (_fts_query(query), limit)).fetchall()
+    where, params = _like_where(("title", "summary", "playbook_content"), query)
+    return conn.execute(f"""
+        SELECT id, title, summary, keywords, saved_at, substr(summary, 1, 120)
+        FROM saved_playbooks WHERE {where} ORDER BY saved_at DESC, id DESC LIMIT ?
+    """, params + [limit]).fetchall()
+
+@traced("db.save_llm_calls")
+def save_llm_calls(run_id, calls):
+    """분석 1회의 LLM 호출 기록 저장"""
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT INTO llm_calls (run_id, label, started_at, latency_ms, ttft_ms, prompt_tokens, output_tokens, retries, cache_hit, status, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (run_id, call['label'], call['started_at'], call['latency_ms'], call['ttft_ms'], call['prompt_tokens'],
+             call['output_tokens'], call['retries'], int(call['cache_hit']), call['status'], call['error'])
+            for call in calls
+        ])
+
+def get_llm_usage_trend(days=30):
+    """최근 N일 일자/호출 유형별 LLM 사용량 집계 (쿼터 산정 및 느린 프롬프트 확인용)"""
+    return get_connection().execute('''
+        SELECT date(started_at) AS day, label, COUNT(*), AVG(latency_ms), MAX(latency_ms), AVG(ttft_ms),
+               SUM(prompt_tokens), SUM(output_tokens), SUM(retries), AVG(cache_hit),
+               SUM(CASE WHEN status = 'ok' THEN 0 ELSE 1 END)
+        FROM llm_calls
+        WHERE started_at >= datetime('now', 'localtime', ?)
+        GROUP BY day, label
+        ORDER BY day DESC, label
+    ''', (f'-{int(days)} days',)).fetchall()
+
+@traced("db.save_run")
+def save_analysis_run(result, profile_hash, snapshot_hash):
+    """분석 1회 결과(입력 프로필, 기사별 결과, 키워드, 출력, 소요 시간) 저장. 반환: run id"""
+    profile = result["profile"]
+    with transaction() as conn:
+        cur = conn.execute('''
+            INSERT INTO analysis_runs (profile_hash, snapshot_hash, company_name, industry_type, profile, risk_keywords,
+                                       playbook_content, llm_selected_keywords, playbook_mode, dashboard_summary,
+                                       report_summary, timings, llm_telemetry, article_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            profile_hash, snapshot_hash, profile["company_name"], profile["industry_type"],
+            json.dumps(profile, ensure_ascii=False),
+            json.dumps(result["risk_keywords"], ensure_ascii=False),
+            result["playbook_content"],
+            json.dumps(result["llm_selected_keywords"], ensure_ascii=False),
+            result.get("playbook_mode"),
+            result["dashboard_summary"],
+            result["report_summary"],
+            json.dumps(result.get("timings_ms") or {}),
+            json.dumps(result.get("llm_telemetry") or {}, ensure_ascii=False),
+            len(result["news_data"]),
+        ))
+        run_id = cur.lastrowid
+        # 본문은 articles에 한 번만 저장하고 실행 기록에는 article_id만 남긴다
+        # (article_id가 없거나 임시 id(음수)인 기사는 여기서 저장하고 실제 id를 채워 넣는다)
+        missing = [n for n in result["news_data"] if (n.get("article_id") or 0) <= 0]
+        article_ids = upsert_articles(missing, conn) if missing else {}
+        ids = [n["article_id"] if (n.get("article_id") or 0) > 0 else article_ids[n["url"]]
+               for n in result["news_data"]]
+        conn.executemany('''
+            INSERT INTO run_articles (run_id, position, article_id, risk_level, risk_score, keywords)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [
+            (run_id, i, article_id, n["risk_level"], n["risk_score"], json.dumps(n["keywords"], ensure_ascii=False))
+            for i, (article_id, n) in enumerate(zip(ids, result["news_data"]))
+        ])
+        today = date.today().isoformat()
+        _rollup_keyword_trends(conn, profile["industry_type"], [
+            (article_id, n.get("published"), n["risk_score"], n["keywords"], today)
+            for article_id, n in zip(ids, result["news_data"])
+        ])
+    # 커밋된 뒤에만 실제 id를 반영 (롤백되면 임시 id 유지)
+    for n in missing:
+        n["article_id"] = article_ids[n["url"]]
+    return run_id
+
+@traced("db.keyword_trend", items=len)
+def get_keyword_trend(industry_type, period="daily", days=30, top_n=5):
+    """
+    업종별 키워드 추이 (롤업 테이블만 조회). 최근 days일 동안 기사 수가 많은 상위 top_n 키워드의 기간별 값.
+    period: 'daily' | 'weekly'
+    반환 행: (기간 시작일, keyword, article_count, score_sum) 기간순
+    """
+    if period not in _TREND_TABLES:
+        raise ValueError(f"알 수 없는 period: {period}")
+    table, bucket = _TREND_TABLES[period]
+    since = date.today() - timedelta(days=days)
+    if period == "weekly":
+        since -= timedelta(days=since.weekday())
+    return get_connection().execute(f'''
+        WITH top AS (
+            SELECT keyword_id FROM {table}
+            WHERE industry_type = ? AND {bucket} >= ?
+            GROUP BY keyword_id ORDER BY SUM(article_count) DESC, keyword_id LIMIT ?
+        )
+        SELECT t.{bucket}, k.keyword, t.article_count, t.score_sum
+        FROM {table} t JOIN top USING (keyword_id) JOIN keywords k ON k.id = t.keyword_id
+        WHERE t.industry_type = ? AND t.{bucket} >= ?
+        ORDER BY t.{bucket}, k.keyword
+    ''', (industry_type, since.isoformat(), top_n, industry_type, since.isoformat())).fetchall()
+
+@traced("db.get_run")
+def get_run(run_id, hydrate=True):
+    """
+    저장된 실행 1건을 파이프라인 결과와 같은 형태의 dict로 조회. 없으면 None
+    hydrate=False면 news_data 항목에 본문 없이 article_id/관심도/점수/키워드만 담는다.
+    """
+    conn = get_connection()
+    row = conn.execute('''
+        SELECT id, profile, risk_keywords, playbook_content, llm_selected_keywords, playbook_mode, dashboard_summary,
+               report_summary, timings, llm_telemetry, created_at
+        FROM analysis_runs WHERE id = ?
+    ''', (run_id,)).fetchone()
+    if not row:
+        return None
+    articles = conn.execute('''
+        SELECT article_id, risk_level, risk_score, keywords FROM run_articles WHERE run_id = ? ORDER BY position
+    ''', (run_id,)).fetchall()
+    news_data = [
+        {"article_id": a[0], "risk_level": a[1], "risk_score": a[2], "keywords": json.loads(a[3] or "[]")}
+        for a in articles
+    ]
+    if hydrate:
+        bodies = get_articles(n["article_id"] for n in news_data)
+        for n in news_data:
+            url, title, source, published, content = bodies.get(n["article_id"], (None, "", "", "", ""))
+            content = content or ""
+            n.update({
+                "url": url, "title": title, "source": source, "published": published, "full_content": content,
+                "summary": content[:250] + "..." if len(content) > 250 else content,
+            })
+    return {
+        "run_id": row[0],
+        "profile": json.loads(row[1]),
+        "risk_keywords": json.loads(row[2]),
+        "playbook_content": row[3],
+        "llm_selected_keywords": json.loads(row[4]),
+        "playbook_mode": row[5],
+        "dashboard_summary": row[6],
+        "report_summary": row[7],
+        "timings_ms": json.loads(row[8] or "{}"),
+        "llm_telemetry": json.loads(row[9] or "{}"),
+        "created_at": row[10],
+        "news_data": news_data,
+    }
+
+def get_latest_run(profile_hash, snapshot_hash=None, max_age_hours=None, hydrate=True):
+    """프로필(및 수집 스냅샷)이 일치하는 가장 최근 실행. max_age_hours보다 오래됐으면 None"""
+    sql = "SELECT id FROM analysis_runs WHERE profile_hash = ?"
+    params = [profile_hash]
+    if snapshot_hash:
+        sql += " AND snapshot_hash = ?"
+        params.append(snapshot_hash)
+    if max_age_hours:
+        sql += " AND created_at >= datetime('now', ?)"
+        params.append(f"-{float(max_age_hours)} hours")
+    sql += " ORDER BY created_at DESC, id DESC LIMIT 1"
+    row = get_connection().execute(sql, params).fetchone()
+    return get_run(row[0], hydrate) if row else None
+
+def get_recent_runs(limit=PAGE_SIZE, profile_hash=None):
+    """실행 기록 목록: (id, company_name, industry_type, article_count, playbook_mode, timings, created_at)"""
+    sql = "SELECT id, company_name, industry_type, article_count, playbook_mode, timings, created_at FROM analysis_runs"
+    params = []
+    if profile_hash:
+        sql += " WHERE profile_hash = ?"
+        params.append(profile_hash)
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return get_connection().execute(sql, params).fetchall()
+
+@traced("db.upsert_articles", items=len)
+def upsert_articles(articles, conn=None):
+    """
+    기사 본문을 공유 저장소에 저장 (url 기준, 본문이 바뀐 경우에만 갱신).
+    articles: url/title/source/published와 content 또는 full_content를 가진 dict 목록. 반환: {url: article_id}
+    """
+    rows = []
+    for art in articles:
+        content = art.get("content", art.get("full_content")) or ""
+        rows.append((art["url"], art.get("title"), art.get("source"), art.get("published", art.get("date")), content,
+                     hashlib.sha256(content.encode("utf-8")).hexdigest()))
+    if not rows:
+        return {}
+
+    def write(c):
+        c.executemany('''
+            INSERT INTO articles (url, title, source, published, content, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = excluded.title, source = excluded.source, published = excluded.published,
+                content = excluded.content, content_hash = excluded.content_hash, fetched_at = CURRENT_TIMESTAMP
+            WHERE content_hash IS NOT excluded.content_hash
+        ''', rows)
+        ids = {}
+        urls = [r[0] for r in rows]
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            ids.update({url: article_id for article_id, url in c.execute(
+                f"SELECT id, url FROM articles WHERE url IN ({', '.join('?' * len(chunk))})", chunk
+            )})
+        return ids
+
+    if conn is not None:
+        return write(conn)
+    with transaction() as conn:
+        return write(conn)
+
+@traced("db.get_articles", items=len)
+def get_articles(article_ids):
+    """기사 본문 조회. 반환: {article_id: (url, title, source, published, content)}"""
+    article_ids = list(article_ids)
+    found = {}
+    conn = get_connection()
+    for i in range(0, len(article_ids), 500):
+        chunk = article_ids[i:i + 500]
+        for row in conn.execute(
+            f"SELECT id, url, title, source, published, content FROM articles WHERE id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ):
+            found[row[0]] = row[1:]
+    return found
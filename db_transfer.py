@@ -0,0 +1,229 @@
+"""
+즐겨찾기/분석 기록 DB를 JSONL 또는 CSV로 일괄 내보내기/가져오기 (분석가 PC 간 이관/복제용).
+fetchmany/배치 executemany로 처리해 행 수와 무관하게 메모리 사용량이 일정하다.
+
+실행:
+    python -m db_transfer export news --out news.jsonl
+    python -m db_transfer export playbooks --out playbooks.csv --db other.db
+    python -m db_transfer import news news.jsonl --on-conflict update
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from database import get_connection, transaction, init_db, set_db_path
+
+BATCH_SIZE = 500
+
+# 종류별 (테이블, 내보낼 컬럼). id는 DB마다 다르므로 내보내지 않는다.
+TABLES = {
+    "news": ("saved_news", ("title", "url", "summary", "keywords", "risk_level", "risk_score", "saved_at")),
+    "playbooks": ("saved_playbooks", ("title", "summary", "playbook_content", "keywords", "saved_at")),
+    "llm_calls": ("llm_calls", ("run_id", "label", "started_at", "latency_ms", "ttft_ms", "prompt_tokens",
+                                "output_tokens", "retries", "cache_hit", "status", "error")),
+}
+
+# 가져오기 SQL. 뉴스는 url 충돌 처리, 나머지는 같은 행이 이미 있으면 건너뛰어 재실행해도 중복되지 않는다.
+_NEWS_INSERT = {
+    "skip": """
+        INSERT INTO saved_news (title, url, summary, keywords, risk_level, risk_score, saved_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(url) DO NOTHING
+    """,
+    "update": """
+        INSERT INTO saved_news (title, url, summary, keywords, risk_level, risk_score, saved_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            title = excluded.title, summary = excluded.summary, keywords = excluded.keywords,
+            risk_level = excluded.risk_level, risk_score = excluded.risk_score, saved_at = excluded.saved_at
+    """,
+}
+_PLAYBOOK_INSERT = """
+    INSERT INTO saved_playbooks (title, summary, playbook_content, keywords, saved_at)
+    SELECT ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM saved_playbooks WHERE title = ?1 AND saved_at = ?5)
+"""
+_LLM_CALL_INSERT = """
+    INSERT INTO llm_calls (run_id, label, started_at, latency_ms, ttft_ms, prompt_tokens, output_tokens,
+                           retries, cache_hit, status, error)
+    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM llm_calls WHERE run_id = ?1 AND label = ?2 AND started_at = ?3 AND latency_ms = ?4)
+"""
+
+
+def _detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def export_table(kind, out_path, fmt=None, batch_size=BATCH_SIZE):
+    """
+    테이블을 JSONL/CSV로 스트리밍 저장. 반환: 내보낸 행 수
+    JSONL은 keywords를 리스트로, CSV는 JSON 문자열 그대로 쓴다.
+    """
+    table, columns = TABLES[kind]
+    fmt = _detect_format(out_path, fmt)
+    cur = get_connection().execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+    count = 0
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = None
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    record = dict(zip(columns, row))
+                    if "keywords" in record:
+                        record["keywords"] = _load_keywords(record["keywords"])
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += len(rows)
+    return count
+
+
+def _load_keywords(raw):
+    try:
+        return json.loads(raw or "[]")
+    except ValueError:
+        return []
+
+
+def _dump_keywords(value):
+    # JSONL은 리스트, CSV는 JSON 문자열로 들어온다
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    return json.dumps(_load_keywords(value), ensure_ascii=False)
+
+
+def read_records(path, fmt=None):
+    """JSONL/CSV 파일에서 레코드 dict를 한 줄씩 읽는다."""
+    fmt = _detect_format(path, fmt)
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for record in csv.DictReader(f):
+                yield {k: (v if v != "" else None) for k, v in record.items()}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _news_params(r):
+    return (r.get("title"), r["url"], r.get("summary"), _dump_keywords(r.get("keywords")), r.get("risk_level"),
+            float(r.get("risk_score") or 0.0), r.get("saved_at") or time.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _playbook_params(r):
+    return (r.get("title"), r.get("summary"), r.get("playbook_content"), _dump_keywords(r.get("keywords")),
+            r.get("saved_at") or time.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _llm_call_params(r):
+    def num(key, cast):
+        value = r.get(key)
+        return cast(value) if value is not None else None
+    return (r.get("run_id"), r.get("label"), r.get("started_at"), num("latency_ms", float), num("ttft_ms", float),
+            num("prompt_tokens", int), num("output_tokens", int), num("retries", int), num("cache_hit", int),
+            r.get("status"), r.get("error"))
+
+
+def _link_batch_keywords(conn, table, link_table, fk, where, params):
+    """배치로 들어간 행들의 keywords(JSON)에서 키워드 사전/링크 테이블을 SQL로 채운다."""
+    conn.execute(f"""
+        INSERT OR IGNORE INTO keywords (keyword)
+        SELECT DISTINCT trim(j.value) FROM {table} t, json_each(t.keywords) j
+        WHERE {where} AND json_valid(t.keywords) AND trim(j.value) != ''
+    """, params)
+    conn.execute(f"""
+        INSERT OR IGNORE INTO {link_table} ({fk}, keyword_id)
+        SELECT t.id, k.id FROM {table} t, json_each(t.keywords) j JOIN keywords k ON k.keyword = trim(j.value)
+        WHERE {where} AND json_valid(t.keywords)
+    """, params)
+
+
+def import_table(kind, path, fmt=None, on_conflict="skip", batch_size=BATCH_SIZE):
+    """
+    JSONL/CSV를 단일 트랜잭션으로 일괄 가져오기 (실패 시 전체 롤백).
+    on_conflict: 뉴스 url 중복 시 'skip'(기존 유지) 또는 'update'(덮어쓰기)
+    반환: {"read": 읽은 행 수, "written": 추가/갱신된 행 수}
+    """
+    if kind not in TABLES:
+        raise ValueError(f"알 수 없는 종류: {kind}")
+    if on_conflict not in _NEWS_INSERT:
+        raise ValueError(f"on_conflict는 skip 또는 update: {on_conflict}")
+    records = read_records(path, fmt)
+    stats = {"read": 0, "written": 0}
+    with transaction() as conn:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            stats["read"] += len(batch)
+            if kind == "news":
+                params = [_news_params(r) for r in batch]
+                urls = [p[1] for p in params]
+                placeholders = ", ".join("?" * len(urls))
+                if on_conflict == "update":
+                    # 덮어쓰는 행의 기존 키워드 링크는 새 키워드로 교체
+                    conn.execute(f"""
+                        DELETE FROM news_keywords WHERE news_id IN (SELECT id FROM saved_news WHERE url IN ({placeholders}))
+                    """, urls)
+                stats["written"] += conn.executemany(_NEWS_INSERT[on_conflict], params).rowcount
+                _link_batch_keywords(conn, "saved_news", "news_keywords", "news_id", f"t.url IN ({placeholders})", urls)
+            elif kind == "playbooks":
+                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM saved_playbooks").fetchone()[0]
+                stats["written"] += conn.executemany(_PLAYBOOK_INSERT, [_playbook_params(r) for r in batch]).rowcount
+                _link_batch_keywords(conn, "saved_playbooks", "playbook_keywords", "playbook_id", "t.id > ?", [max_id])
+            else:
+                stats["written"] += conn.executemany(_LLM_CALL_INSERT, [_llm_call_params(r) for r in batch]).rowcount
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="즐겨찾기/분석 기록 일괄 내보내기·가져오기")
+    parser.add_argument("--db", default=None, help="대상 DB 파일 (기본: BOOKMARKS_DB_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="JSONL/CSV로 내보내기")
+    p_export.add_argument("kind", choices=sorted(TABLES))
+    p_export.add_argument("--out", required=True, help="출력 파일 (.csv면 CSV, 그 외 JSONL)")
+    p_export.add_argument("--format", choices=["jsonl", "csv"], default=None)
+
+    p_import = sub.add_parser("import", help="JSONL/CSV 가져오기")
+    p_import.add_argument("kind", choices=sorted(TABLES))
+    p_import.add_argument("path", help="입력 파일")
+    p_import.add_argument("--format", choices=["jsonl", "csv"], default=None)
+    p_import.add_argument("--on-conflict", choices=["skip", "update"], default="skip",
+                          help="뉴스 url 중복 시 처리 (기본: skip)")
+
+    args = parser.parse_args(argv)
+    if args.db:
+        set_db_path(args.db)
+    init_db()
+
+    start = time.perf_counter()
+    if args.command == "export":
+        count = export_table(args.kind, args.out, args.format)
+        print(f"{args.kind} {count}건 내보내기 완료 ({time.perf_counter() - start:.1f}초) → {args.out}")
+    else:
+        if not os.path.exists(args.path):
+            print(f"입력 파일이 없습니다: {args.path}")
+            return 1
+        stats = import_table(args.kind, args.path, args.format, args.on_conflict)
+        print(f"{args.kind} {stats['read']}건 중 {stats['written']}건 반영 ({time.perf_counter() - start:.1f}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import json
+import re
+import time
+import random
+import hashlib
+import threading
+
+from config import (
+    GEMINI_API_KEY, GEMINI_MODEL_NAME, GENERATION_CONFIG, LLM_BACKEND,
+    STUB_LATENCY_MS, STUB_TOKENS_PER_SEC, STUB_FAILURE_RATE, STUB_FAILURE_STATUS, STUB_SEED,
+)
+
+
+class UsageMetadata:
+    """Gemini usage_metadata와 같은 필드 이름을 가진 사용량 정보"""
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class LLMResponse:
+    """백엔드 공통 응답 (.text, .usage_metadata, .first_token_latency 초)"""
+    def __init__(self, text: str, usage_metadata: UsageMetadata = None, first_token_latency: float = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self.first_token_latency = first_token_latency
+
+
+class LLMBackend:
+    """
+    llm_generator 함수들이 의존하는 LLM 백엔드 인터페이스.
+    generate_content(prompt)는 .text와 .usage_metadata를 가진 응답을 반환한다.
+    """
+    name = "base"
+
+    def generate_content(self, prompt: str):
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini API 백엔드 (google-generativeai는 생성 시점에 임포트)"""
+    name = "gemini"
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, model_name: str = GEMINI_MODEL_NAME,
+                 generation_config: dict = None):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name, generation_config=generation_config or GENERATION_CONFIG)
+
+    def generate_content(self, prompt: str):
+        # 스트리밍으로 받아 첫 청크 도착 시간(TTFT)을 측정
+        start = time.perf_counter()
+        first_token_latency = None
+        resp = self.model.generate_content(prompt, stream=True)
+        for _ in resp:
+            if first_token_latency is None:
+                first_token_latency = time.perf_counter() - start
+        return LLMResponse(resp.text, getattr(resp, "usage_metadata", None), first_token_latency)
+
+
+class StubBackendError(Exception):
+    """스텁 백엔드의 장애 주입용 예외 (code 속성에 HTTP 상태 코드)"""
+    def __init__(self, code: int, message: str = ""):
+        super().__init__(f"{code} {message}".strip())
+        self.code = code
+
+
+class StubBackend(LLMBackend):
+    """
+    네트워크/API 키 없이 파이프라인을 부하 테스트하기 위한 로컬 스텁.
+    - 같은 프롬프트에는 항상 같은 응답 (결정적 출력)
+    - latency_ms: 첫 토큰까지의 고정 지연
+    - tokens_per_sec: 출력 토큰 생성 속도 (0이면 즉시 반환)
+    - failure_rate / failure_status: 지정 확률로 HTTP 오류 주입 (seed 기반 순차 난수)
+    """
+    name = "stub"
+
+    def __init__(self, latency_ms: float = STUB_LATENCY_MS, tokens_per_sec: float = STUB_TOKENS_PER_SEC,
+                 failure_rate: float = STUB_FAILURE_RATE, failure_status: int = STUB_FAILURE_STATUS,
+                 seed: int = STUB_SEED):
+        self.latency_ms = latency_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.seed = seed
+        self._failure_rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, prompt: str):
+        from llm_client import estimate_tokens
+
+        with self._lock:
+            self.calls += 1
+            fail = self.failure_rate > 0 and self._failure_rng.random() < self.failure_rate
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        first_token_latency = self.latency_ms / 1000.0
+        if fail:
+            raise StubBackendError(self.failure_status, "stub injected failure")
+
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        text = _stub_text(prompt, rng)
+        prompt_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        if self.tokens_per_sec:
+            time.sleep(output_tokens / float(self.tokens_per_sec))
+        return LLMResponse(text, UsageMetadata(prompt_tokens, output_tokens), first_token_latency)
+
+
+def _section_after(prompt: str, header: str) -> str:
+    m = re.search(re.escape(header) + r"\s*\n(.*?)(?:\n\s*\n|\Z)", prompt, flags=re.S)
+    return m.group(1).strip() if m else ""
+
+
+def _stub_text(prompt: str, rng: random.Random) -> str:
+    """프롬프트 유형(키워드 JSON/플레이북/대시보드 요약/기사 요약)에 맞는 형식의 가짜 응답"""
+    if "JSON 배열만 출력" in prompt:
+        m = re.search(r"후보:\s*(.*)", prompt)
+        candidates = [k.strip() for k in (m.group(1) if m else "").split(",") if k.strip()]
+        return json.dumps(
+            [{"keyword": k, "rationale": "스텁 응답 근거"} for k in candidates[:12]],
+            ensure_ascii=False,
+        )
+    if "플레이북" in prompt:
+        keyword_text = _section_after(prompt, "[최신 보안 키워드 후보]") or _section_after(prompt, "[신규 위협 키워드]")
+        keywords = [k.strip() for k in keyword_text.split(",") if k.strip() and k.strip() != "(없음)"]
+        keywords = keywords or ["보안 위협"]
+        # 증분 재생성 프롬프트는 출력할 섹션 헤더를 직접 지정한다
+        tail = prompt.rsplit("출력 형식:", 1)[-1]
+        sections = [(int(n), name) for n, name in re.findall(r'^## (\d)\) (.+)$', tail, flags=re.M)]
+        if not sections:
+            names = ["상황요약", "긴급", "단기", "중장기", "탐지룰/모니터링", "커뮤니케이션", "체크리스트"]
+            sections = list(enumerate(names, 1))
+        lines = []
+        for i, name in sections:
+            lines.append(f"## {i}) {name}")
+            for _ in range(3):
+                kw = keywords[rng.randrange(len(keywords))]
+                lines.append(f"- [보안 담당자] {kw} 대응 조치 {rng.randint(1, 99)} (검증: 점검표 확인)")
+            lines.append("")
+        return "\n".join(lines).strip()
+    if "3문장" in prompt:
+        return "스텁 동향 문장입니다. 스텁 영향 문장입니다. 스텁 권장 조치 문장입니다."
+    n = rng.randint(3, 5)
+    return "\n".join(f"스텁 요약 문장 {i + 1}." for i in range(n)) + "\n왜 우리에게 중요한가: 스텁 응답입니다."
+
+
+def create_backend(kind: str = None) -> LLMBackend:
+    """설정(LLM_BACKEND)에 따라 백엔드 생성: 'gemini' 또는 'stub'"""
+    kind = (kind or LLM_BACKEND).lower()
+    if kind == "stub":
+        return StubBackend()
+    if kind == "gemini":
+        return GeminiBackend()
+    raise ValueError(f"알 수 없는 LLM 백엔드: {kind}")
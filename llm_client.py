@@ -0,0 +1,271 @@
+import time
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+from config import (
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_DAILY_REQUEST_LIMIT, LLM_DAILY_TOKEN_BUDGET,
+    LLM_BUDGET_SAFETY_RATIO, LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SEC, LLM_BACKOFF_MAX_SEC,
+    LLM_RATE_LIMIT_WAIT_SEC, LLM_RESPONSE_CACHE_SIZE, LLM_RESPONSE_CACHE_TTL_SEC,
+)
+from llm_backend import LLMBackend
+from llm_telemetry import record_call, current_label
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMQuotaExceeded(Exception):
+    """일일 예산 또는 API 할당량이 소진되어 LLM을 호출할 수 없을 때 발생"""
+
+
+class CachedResponse:
+    """캐시된 응답을 Gemini 응답과 같은 형태(.text)로 감싼 객체"""
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    모델 호출 없이 토큰 수를 근사한다.
+    한글/한자는 글자당 약 1토큰, 그 외 문자는 4글자당 1토큰으로 계산.
+    """
+    if not text:
+        return 0
+    cjk = sum(1 for ch in text if '가' <= ch <= '힣' or 'ㄱ' <= ch <= 'ㆎ' or '一' <= ch <= '鿿')
+    other = sum(1 for ch in text if not ch.isspace()) - cjk
+    return cjk + (other + 3) // 4
+
+
+def _status_code(exc: Exception):
+    """google.api_core 예외(.code) 또는 HTTP 응답(.status_code)에서 상태 코드 추출"""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if callable(code):
+            try:
+                code = code()
+            except Exception:
+                code = None
+        if isinstance(code, int):
+            return code
+        value = getattr(code, "value", None)
+        if isinstance(value, int) and value >= 100:
+            return value
+    msg = str(exc)
+    if "429" in msg or "quota" in msg.lower() or "resource exhausted" in msg.lower():
+        return 429
+    for code in (500, 502, 503, 504):
+        if str(code) in msg:
+            return code
+    return None
+
+
+class TokenBucket:
+    """분당 허용량(rate_per_minute)만큼 채워지는 토큰 버킷 (스레드 안전)"""
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1, timeout: float = None) -> bool:
+        """토큰을 확보할 때까지 대기. timeout 안에 확보하지 못하면 False"""
+        amount = min(amount, self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self.rate if self.rate > 0 else float("inf")
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+
+class DailyBudget:
+    """하루 단위 요청/토큰 사용량을 추적하고 하드 한도 전에 호출을 막는다."""
+    def __init__(self, request_limit: int, token_limit: int, safety_ratio: float = 1.0):
+        self.request_limit = int(request_limit * safety_ratio)
+        self.token_limit = int(token_limit * safety_ratio)
+        self._day = date.today()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self.requests = self.prompt_tokens = self.output_tokens = 0
+
+    def allows(self, estimated_tokens: int) -> bool:
+        with self._lock:
+            self._roll()
+            if self.requests + 1 > self.request_limit:
+                return False
+            return self.prompt_tokens + self.output_tokens + estimated_tokens <= self.token_limit
+
+    def record(self, prompt_tokens: int, output_tokens: int):
+        with self._lock:
+            self._roll()
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._roll()
+            return {
+                "date": self._day.isoformat(),
+                "requests": self.requests,
+                "request_limit": self.request_limit,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "token_limit": self.token_limit,
+            }
+
+
+class LLMClient(LLMBackend):
+    """
+    LLM 백엔드(Gemini/스텁) 래퍼.
+    - 요청/토큰 버킷으로 요금제 한도 이하로 호출 속도 제한
+    - 429/5xx 응답에 지터가 포함된 지수 백오프 재시도
+    - 일일 예산 초과 또는 재시도 소진 시 캐시 응답으로 대체, 캐시가 없으면 LLMQuotaExceeded
+    - 호출마다 지연/첫 토큰 시간/토큰 수/재시도/캐시 적중을 llm_telemetry에 기록
+    기존 코드와 같이 generate_content(prompt).text 형태로 사용한다.
+    """
+    name = "client"
+
+    def __init__(self, model: LLMBackend, request_bucket: TokenBucket = None, token_bucket: TokenBucket = None,
+                 budget: DailyBudget = None, max_retries: int = LLM_MAX_RETRIES):
+        self.model = model
+        self.request_bucket = request_bucket or _request_bucket
+        self.token_bucket = token_bucket or _token_bucket
+        self.budget = budget or _daily_budget
+        self.max_retries = max_retries
+
+    def generate_content(self, prompt: str):
+        stats = {"retries": 0, "cache_hit": False, "prompt_tokens": 0, "output_tokens": 0, "ttft_ms": None}
+        started_at, t0 = datetime.now(), time.perf_counter()
+        status, error = "ok", None
+        try:
+            return self._generate(prompt, stats)
+        except Exception as e:
+            status, error = ("quota" if isinstance(e, LLMQuotaExceeded) else "error"), str(e)[:500]
+            raise
+        finally:
+            record_call(
+                current_label(), started_at, (time.perf_counter() - t0) * 1000.0, stats["ttft_ms"],
+                stats["prompt_tokens"], stats["output_tokens"], stats["retries"], stats["cache_hit"], status, error,
+            )
+
+    def _generate(self, prompt: str, stats: dict):
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        est_tokens = estimate_tokens(prompt)
+
+        # 같은 프롬프트가 최근(TTL 내)에 호출되었으면 API를 다시 부르지 않는다.
+        fresh = _cache_get(key, max_age=LLM_RESPONSE_CACHE_TTL_SEC)
+        if fresh is not None:
+            stats["cache_hit"] = True
+            return CachedResponse(fresh)
+
+        if not self.budget.allows(est_tokens):
+            return self._degrade(key, "일일 LLM 사용 예산에 도달했습니다.", stats)
+
+        last_exc = None
+        for attempt in range(self.max_retries + 1):
+            if not (self.request_bucket.acquire(1, timeout=LLM_RATE_LIMIT_WAIT_SEC)
+                    and self.token_bucket.acquire(est_tokens, timeout=LLM_RATE_LIMIT_WAIT_SEC)):
+                return self._degrade(key, "LLM 호출 대기 시간이 초과되었습니다.", stats)
+            call_start = time.perf_counter()
+            try:
+                resp = self.model.generate_content(prompt)
+            except Exception as e:
+                status = _status_code(e)
+                if status not in RETRYABLE_STATUS:
+                    raise
+                last_exc = e
+                if attempt < self.max_retries:
+                    stats["retries"] += 1
+                    delay = min(LLM_BACKOFF_MAX_SEC, LLM_BACKOFF_BASE_SEC * (2 ** attempt))
+                    time.sleep(random.uniform(0, delay))
+                    continue
+                if status == 429:
+                    return self._degrade(key, f"Gemini API 할당량 초과: {e}", stats)
+                raise
+
+            prompt_tokens, output_tokens = _usage_tokens(resp, est_tokens)
+            self.budget.record(prompt_tokens, output_tokens)
+            stats["prompt_tokens"], stats["output_tokens"] = prompt_tokens, output_tokens
+            ttft = getattr(resp, "first_token_latency", None)
+            stats["ttft_ms"] = ttft * 1000.0 if ttft is not None else (time.perf_counter() - call_start) * 1000.0
+            text = getattr(resp, "text", None)
+            if text:
+                _cache_put(key, text)
+            return resp
+        raise last_exc
+
+    def _degrade(self, key: str, reason: str, stats: dict):
+        cached = _cache_get(key)
+        if cached is not None:
+            stats["cache_hit"] = True
+            return CachedResponse(cached)
+        raise LLMQuotaExceeded(reason)
+
+    def usage(self) -> dict:
+        return self.budget.snapshot()
+
+
+def _usage_tokens(resp, est_prompt_tokens: int):
+    """응답의 usage_metadata에서 입력/출력 토큰 수 추출 (없으면 추정치)"""
+    usage = getattr(resp, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) if usage else None
+    output_tokens = getattr(usage, "candidates_token_count", None) if usage else None
+    if prompt_tokens is None:
+        prompt_tokens = est_prompt_tokens
+    if output_tokens is None:
+        try:
+            output_tokens = estimate_tokens(resp.text or "")
+        except Exception:
+            output_tokens = 0
+    return int(prompt_tokens), int(output_tokens)
+
+
+# 프로세스 전역 상태: 여러 Streamlit 세션이 같은 한도를 공유한다.
+_request_bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+_token_bucket = TokenBucket(LLM_TOKENS_PER_MINUTE)
+_daily_budget = DailyBudget(LLM_DAILY_REQUEST_LIMIT, LLM_DAILY_TOKEN_BUDGET, LLM_BUDGET_SAFETY_RATIO)
+
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: str, max_age: float = None):
+    """캐시된 응답 텍스트. max_age(초)를 주면 그보다 오래된 항목은 무시"""
+    with _cache_lock:
+        if key in _response_cache:
+            text, stored_at = _response_cache[key]
+            if max_age is not None and time.monotonic() - stored_at > max_age:
+                return None
+            _response_cache.move_to_end(key)
+            return text
+    return None
+
+
+def _cache_put(key: str, text: str):
+    with _cache_lock:
+        _response_cache[key] = (text, time.monotonic())
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > LLM_RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
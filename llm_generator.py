@@ -1,8 +1,14 @@
 import json
 import re
-import google.generativeai as genai
 import feedparser
+from config import PROMPT_TOKEN_BUDGETS, INCREMENTAL_TOP_N, INCREMENTAL_MAX_DELTA_RATIO
+from context_packer import pack_sentences, pack_keywords, pack_lines
+from llm_backend import LLMBackend
+from llm_client import LLMQuotaExceeded
+from llm_telemetry import llm_call
+from tracing import traced
 
+@traced("llm.fetch_headlines", items=len)
 def fetch_headlines_for_summary(rss_url: str, limit: int = 15):
     """지정된 RSS URL에서 최신 뉴스 헤드라인 목록을 가져옵니다."""
     try:
@@ -18,7 +24,8 @@ def fetch_headlines_for_summary(rss_url: str, limit: int = 15):
         print(f"RSS 피드 로딩 실패: {e}")
         return []
 
-def generate_dashboard_summary(headlines: list, company_info: dict, infrastructure: str, constraints: str, gemini_model):
+@traced("llm.dashboard_summary")
+def generate_dashboard_summary(headlines: list, company_info: dict, infrastructure: str, constraints: str, gemini_model: LLMBackend):
     """헤드라인과 기업 정보를 바탕으로 대시보드용 요약 및 권장 조치를 생성합니다."""
     if not headlines:
         return "최신 보안 뉴스를 가져오는 데 실패했습니다."
@@ -48,19 +55,23 @@ def generate_dashboard_summary(headlines: list, company_info: dict, infrastructu
 """.strip()
 
     try:
-        res = gemini_model.generate_content(prompt)
+        with llm_call("dashboard_summary"):
+            res = gemini_model.generate_content(prompt)
         return res.text
     except Exception as e:
         print(f"대시보드 요약 생성 실패: {e}")
         return "AI 기반 보안 동향 요약 생성에 실패했습니다. API 상태를 확인해주세요."
 
-def generate_article_summary(title: str, content: str, severity_label: str, company_info: dict, infrastructure: str, gemini_model):
+@traced("llm.article_summary")
+def generate_article_summary(title: str, content: str, severity_label: str, company_info: dict, infrastructure: str, gemini_model: LLMBackend, keyword_weights: dict = None):
     """
     message.txt 의도 반영:
     - 3~5문장 요약
     - 마지막 줄: '왜 우리에게 중요한가' 1문장
     - 맥락 힌트: 심각도/업종/인프라
+    - 본문은 keyword_weights(키워드→위험 가중치) 기준으로 중요한 문장부터 토큰 예산만큼 발췌
     """
+    excerpt = pack_sentences(content, keyword_weights or {}, PROMPT_TOKEN_BUDGETS["article_content"])
     prompt = f"""
 다음 한국어 보안 뉴스를 3~5문장으로 간결하게 요약하세요.
 마지막 줄에 '왜 우리에게 중요한가'를 1문장으로 설명하세요.
@@ -70,7 +81,7 @@ def generate_article_summary(title: str, content: str, severity_label: str, comp
 {title}
 
 [기사 본문(발췌)]
-{content[:2800]}
+{excerpt}
 
 [맥락 힌트]
 - 심각도: {severity_label}
@@ -80,20 +91,25 @@ def generate_article_summary(title: str, content: str, severity_label: str, comp
 출력 형식: 문단 3~5개 + 마지막 1문장(왜 중요한가).
 """.strip()
     try:
-        res = gemini_model.generate_content(prompt)
+        with llm_call("article_summary"):
+            res = gemini_model.generate_content(prompt)
         return res.text
     except Exception:
         return "요약 생성 실패."
 
-def generate_playbook_with_llm(keywords, company_info, infrastructure, constraints, gemini_model, news_briefs=None):
+@traced("llm.playbook")
+def generate_playbook_with_llm(keywords, company_info, infrastructure, constraints, gemini_model: LLMBackend, news_briefs=None, keyword_scores=None):
     """
     - message.txt 의도 반영 통합 플레이북:
       긴급/단기/중장기 구간 + 탐지룰 + 커뮤니케이션 + 체크리스트
     - LLM 인풋 및 결과 로그 저장
     - 중요 키워드 JSON 재요청
+    - 키워드는 keyword_scores(빈도 × 업종 가중치) 순, 뉴스는 입력 순으로 토큰 예산만큼 포함
     """
     # 0) 상위 뉴스 1줄 요약 목록
-    news_briefs = news_briefs or []
+    news_briefs = pack_lines(news_briefs or [], PROMPT_TOKEN_BUDGETS["playbook_news"])
+    prompt_keywords = pack_keywords(keywords, PROMPT_TOKEN_BUDGETS["playbook_keywords"], keyword_scores)
+    candidate_keywords = pack_keywords(keywords, PROMPT_TOKEN_BUDGETS["keyword_candidates"], keyword_scores)
     company_info_str = json.dumps(company_info, ensure_ascii=False)
 
     mode_line = "가능한 저예산/간소화 모드를 우선 고려" if (constraints and any(x in constraints.lower() for x in ["저예산","budget","비용","한정"])) else "표준 모드로 실행"
@@ -115,10 +131,10 @@ def generate_playbook_with_llm(keywords, company_info, infrastructure, constrain
 {infrastructure}
 
 [최신 보안 키워드 후보]
-{", ".join(keywords[:40])}
+{", ".join(prompt_keywords)}
 
 [상위 뉴스 요약(각 1줄)]
-{chr(10).join(f"- {line}" for line in news_briefs[:8]) if news_briefs else "- (없음)"}
+{chr(10).join(f"- {line}" for line in news_briefs) if news_briefs else "- (없음)"}
 
 [제약]
 {constraints or "없음"}
@@ -134,8 +150,11 @@ def generate_playbook_with_llm(keywords, company_info, infrastructure, constrain
 """.strip()
 
     try:
-        resp = gemini_model.generate_content(prompt)
+        with llm_call("playbook"):
+            resp = gemini_model.generate_content(prompt)
         playbook = resp.text or ""
+    except LLMQuotaExceeded:
+        raise
     except Exception as e:
         playbook = f"플레이북 생성 실패: {e}"
 
@@ -144,7 +163,7 @@ def generate_playbook_with_llm(keywords, company_info, infrastructure, constrain
 다음 키워드 후보에서 중소기업 환경에 가장 관련 높은 상위 12개를 고르세요.
 JSON 배열만 출력하세요.
 
-후보: {', '.join(keywords)}
+후보: {', '.join(candidate_keywords)}
 
 스키마:
 [
@@ -154,7 +173,8 @@ JSON 배열만 출력하세요.
 """.strip()
     llm_selected_keywords = []
     try:
-        kw_resp = gemini_model.generate_content(kw_prompt)
+        with llm_call("keyword_select"):
+            kw_resp = gemini_model.generate_content(kw_prompt)
         raw = (kw_resp.text or "").strip()
         # JSON만 출력하도록 요청했지만 방어적으로 파싱
         json_str = re.search(r'\[.*\]', raw, flags=re.S)
@@ -164,6 +184,181 @@ JSON 배열만 출력하세요.
             raise ValueError("JSON 파싱 실패")
     except Exception:
         # 실패 시 상위 12개 키워드 단순 절단
-        llm_selected_keywords = [{"keyword": k, "rationale": "자동 대체(파싱 실패)"} for k in keywords[:12]]
+        llm_selected_keywords = [{"keyword": k, "rationale": "자동 대체(파싱 실패)"} for k in candidate_keywords[:12]]
 
-    return playbook, llm_selected_keywords
\ No newline at end of file
+    return playbook, llm_selected_keywords
+
+PLAYBOOK_SECTIONS = ["상황요약", "긴급", "단기", "중장기", "탐지룰/모니터링", "커뮤니케이션", "체크리스트"]
+
+def split_playbook_sections(playbook: str, required=None):
+    """
+    플레이북을 '1) 상황요약' ~ '7) 체크리스트' 헤더 기준으로 분리.
+    반환: (머리말, {섹션번호: 섹션 텍스트(헤더 포함)}), required 섹션이 모두 없으면 None
+    """
+    required = set(required or range(1, len(PLAYBOOK_SECTIONS) + 1))
+    heads = []
+    for n, name in enumerate(PLAYBOOK_SECTIONS, 1):
+        stem = re.escape(name.split("/")[0])
+        m = re.search(rf'^[#*\s]*{n}\s*[).]\s*\**\s*{stem}.*$', playbook, flags=re.M)
+        if m:
+            heads.append((m.start(), n))
+    heads.sort()
+    if not required <= {n for _, n in heads} or [n for _, n in heads] != sorted(n for _, n in heads):
+        return None
+    preamble = playbook[:heads[0][0]].strip() if heads else playbook.strip()
+    sections = {}
+    for i, (start, n) in enumerate(heads):
+        end = heads[i + 1][0] if i + 1 < len(heads) else len(playbook)
+        sections[n] = playbook[start:end].strip()
+    return preamble, sections
+
+def compute_keyword_delta(previous_keywords, keywords, keyword_scores=None, top_n: int = 12):
+    """
+    이전 플레이북 키워드와 현재 키워드 비교.
+    - added: 현재 상위 top_n 중 이전에 없던 키워드
+    - removed: 이전 키워드 중 현재 후보 전체에서 사라진 키워드
+    """
+    ranked = sorted(keywords, key=lambda k: -(keyword_scores or {}).get(k, 0.0)) if keyword_scores else list(keywords)
+    prev, current = set(previous_keywords), set(keywords)
+    added = [k for k in ranked[:top_n] if k not in prev]
+    removed = [k for k in previous_keywords if k not in current]
+    return added, removed
+
+def affected_playbook_sections(sections: dict, added, removed):
+    """신규 위협은 상황요약/긴급/탐지룰/체크리스트, 사라진 위협은 해당 키워드를 언급한 섹션을 재생성"""
+    if not added and not removed:
+        return []
+    affected = {1}
+    if added:
+        affected.update({2, 5, 7})
+    for n, text in sections.items():
+        if any(k.lower() in text.lower() for k in removed):
+            affected.add(n)
+    return sorted(affected)
+
+@traced("llm.playbook_incremental")
+def generate_playbook_incremental(keywords, company_info, infrastructure, constraints, gemini_model: LLMBackend,
+                                  previous_playbook: str, previous_keywords, news_briefs=None, keyword_scores=None):
+    """
+    가장 최근 저장된 플레이북 대비 키워드 변화분만 재생성해 기존 플레이북에 이어 붙인다.
+    - 변화 없음: 저장본 재사용 (LLM 호출 없음)
+    - 변화가 크거나 섹션 구조를 해석할 수 없거나 증분 생성이 실패하면 전체 재생성으로 폴백
+    반환: (플레이북, 선별 키워드, {"mode", "added", "removed", "sections"})
+    """
+    added, removed = compute_keyword_delta(previous_keywords, keywords, keyword_scores, INCREMENTAL_TOP_N)
+    info = {"mode": "full", "added": added, "removed": removed, "sections": []}
+    parsed = split_playbook_sections(previous_playbook or "")
+    delta_ratio = (len(added) + len(removed)) / float(max(len(previous_keywords), 1))
+    if parsed is None or not previous_keywords or delta_ratio > INCREMENTAL_MAX_DELTA_RATIO:
+        playbook, selected = generate_playbook_with_llm(
+            keywords, company_info, infrastructure, constraints, gemini_model,
+            news_briefs=news_briefs, keyword_scores=keyword_scores
+        )
+        info["sections"] = list(range(1, len(PLAYBOOK_SECTIONS) + 1))
+        return playbook, selected, info
+
+    preamble, sections = parsed
+    selected = [{"keyword": k, "rationale": "이전 플레이북 유지"} for k in previous_keywords if k not in removed]
+    selected += [{"keyword": k, "rationale": "신규 위협"} for k in added]
+    selected = selected[:INCREMENTAL_TOP_N]
+    targets = affected_playbook_sections(sections, added, removed)
+    if not targets:
+        info["mode"] = "reuse"
+        return previous_playbook, selected, info
+
+    # 신규 키워드를 언급한 뉴스만 맥락으로 전달
+    related_news = [b for b in (news_briefs or []) if any(k.lower() in b.lower() for k in added)]
+    related_news = pack_lines(related_news, PROMPT_TOKEN_BUDGETS["playbook_news"])
+    old_sections = "\n\n".join(sections[n] for n in targets)
+    headers = "\n".join(f"## {n}) {PLAYBOOK_SECTIONS[n - 1]}" for n in targets)
+    prompt = f"""
+당신은 중소기업 보안 전문가입니다. 기존 대응 플레이북 중 아래 섹션만 최신 위협 변화에 맞게 다시 작성하세요.
+- 신규 위협은 구체 조치/담당자/검증 기준과 함께 반영
+- 사라진 위협에 대한 조치는 제거
+- 기존 섹션의 유효한 조치는 유지하고 형식(Markdown)을 그대로 따를 것
+
+[회사 프로필(JSON)]
+{json.dumps(company_info, ensure_ascii=False)}
+
+[인프라]
+{infrastructure}
+
+[제약]
+{constraints or "없음"}
+
+[신규 위협 키워드]
+{", ".join(added) if added else "(없음)"}
+
+[사라진 위협 키워드]
+{", ".join(removed) if removed else "(없음)"}
+
+[관련 뉴스(각 1줄)]
+{chr(10).join(f"- {line}" for line in related_news) if related_news else "- (없음)"}
+
+[기존 섹션]
+{old_sections}
+
+출력 형식: 아래 헤더로 시작하는 섹션만 순서대로 출력하고 다른 텍스트는 포함하지 마세요.
+{headers}
+""".strip()
+
+    try:
+        with llm_call("playbook_incremental"):
+            resp = gemini_model.generate_content(prompt)
+        new_parsed = split_playbook_sections(resp.text or "", required=targets)
+    except LLMQuotaExceeded:
+        raise
+    except Exception as e:
+        print(f"증분 플레이북 생성 실패: {e}")
+        new_parsed = None
+    if new_parsed is None:
+        # 부분 응답을 해석하지 못하면 오래된 저장본 대신 전체 재생성으로 폴백
+        playbook, selected = generate_playbook_with_llm(
+            keywords, company_info, infrastructure, constraints, gemini_model,
+            news_briefs=news_briefs, keyword_scores=keyword_scores
+        )
+        info["sections"] = list(range(1, len(PLAYBOOK_SECTIONS) + 1))
+        return playbook, selected, info
+
+    for n in targets:
+        sections[n] = new_parsed[1][n]
+    parts = ([preamble] if preamble else []) + [sections[n] for n in sorted(sections)]
+    info["mode"] = "incremental"
+    info["sections"] = targets
+    return "\n\n".join(parts), selected, info
+
+def build_template_playbook(keywords, company_info, infrastructure, constraints):
+    """LLM 할당량 소진 시 사용하는 기본 템플릿 플레이북 (LLM 호출 없음)"""
+    top = keywords[:5] or ["랜섬웨어", "피싱"]
+    kw_str = ", ".join(top)
+    name = company_info.get("name", "중소기업")
+    return f"""## 1) 상황요약
+- 최근 보안 뉴스에서 {kw_str} 관련 위협이 빈번하게 언급되었습니다.
+- 본 플레이북은 AI 호출 한도 초과로 기본 템플릿을 기반으로 작성되었습니다.
+
+## 2) 긴급
+- [보안 담당자] {kw_str} 관련 최신 보안 패치 및 CVE 적용 여부 점검 (검증: 패치 적용 현황표 100% 갱신)
+- [IT 담당자] 관리자 계정 MFA 적용 및 불필요한 외부 노출 포트 차단 (검증: 외부 포트 스캔 결과 확인)
+
+## 3) 단기
+- [IT 담당자] {infrastructure} 환경의 접근 권한/보안 설정 재점검 (검증: 권한 검토 보고서)
+- [보안 담당자] 중요 데이터 오프라인 백업 및 복구 훈련 (검증: 복구 테스트 성공 기록)
+
+## 4) 중장기
+- [보안 담당자] EDR/SIEM 도입 또는 고도화 검토 (검증: 탐지 커버리지 목록)
+- [경영진] {name} 보안 정책 및 사고 대응 절차 문서화 (검증: 승인된 정책 문서)
+
+## 5) 탐지룰/모니터링
+- 로그 소스: 방화벽, VPN, 이메일 게이트웨이, 엔드포인트
+- 룰 개요: {kw_str} 관련 IoC 및 비정상 로그인 시도 탐지
+
+## 6) 커뮤니케이션
+- 임직원 대상 피싱/사회공학 주의 공지 및 모의훈련
+- 사고 발생 시 KISA(118) 및 관계기관 신고 절차 공유
+
+## 7) 체크리스트
+- [ ] 긴급 패치 적용 완료
+- [ ] MFA 적용률 100%
+- [ ] 백업 복구 테스트 완료
+- [ ] 제약사항 반영: {constraints or "없음"}
+"""
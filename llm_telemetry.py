@@ -0,0 +1,112 @@
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+_call_label = contextvars.ContextVar("llm_call_label", default="unknown")
+_current_run = contextvars.ContextVar("llm_telemetry_run", default=None)
+
+
+@contextmanager
+def llm_call(label: str):
+    """이 블록 안에서 발생한 LLM 호출에 label(예: 'playbook')을 붙인다."""
+    token = _call_label.set(label)
+    try:
+        yield
+    finally:
+        _call_label.reset(token)
+
+
+def current_label() -> str:
+    return _call_label.get()
+
+
+class RunTelemetry:
+    """분석 1회(run) 동안의 LLM 호출 기록"""
+    def __init__(self, run_id: str = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = datetime.now()
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def record(self, call: dict):
+        with self._lock:
+            self.calls.append(call)
+
+    def summary(self) -> dict:
+        """라벨별 호출 수/지연/토큰/재시도/캐시 적중 집계"""
+        with self._lock:
+            calls = list(self.calls)
+        by_label = {}
+        for c in calls:
+            agg = by_label.setdefault(c["label"], {
+                "calls": 0, "errors": 0, "cache_hits": 0, "retries": 0,
+                "latency_ms_total": 0.0, "latency_ms_max": 0.0, "ttft_ms_total": 0.0, "ttft_samples": 0,
+                "prompt_tokens": 0, "output_tokens": 0,
+            })
+            agg["calls"] += 1
+            agg["errors"] += 1 if c["status"] != "ok" else 0
+            agg["cache_hits"] += 1 if c["cache_hit"] else 0
+            agg["retries"] += c["retries"]
+            agg["latency_ms_total"] += c["latency_ms"]
+            agg["latency_ms_max"] = max(agg["latency_ms_max"], c["latency_ms"])
+            if c["ttft_ms"] is not None:
+                agg["ttft_ms_total"] += c["ttft_ms"]
+                agg["ttft_samples"] += 1
+            agg["prompt_tokens"] += c["prompt_tokens"]
+            agg["output_tokens"] += c["output_tokens"]
+        for agg in by_label.values():
+            agg["latency_ms_avg"] = agg["latency_ms_total"] / agg["calls"]
+            agg["ttft_ms_avg"] = agg["ttft_ms_total"] / agg["ttft_samples"] if agg["ttft_samples"] else None
+        total_calls = len(calls)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "calls": total_calls,
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+            "output_tokens": sum(c["output_tokens"] for c in calls),
+            "latency_ms_total": sum(c["latency_ms"] for c in calls),
+            "cache_hit_rate": (sum(1 for c in calls if c["cache_hit"]) / total_calls) if total_calls else 0.0,
+            "by_label": by_label,
+        }
+
+
+def start_run(run_id: str = None) -> RunTelemetry:
+    """현재 컨텍스트(세션 스레드)에 새 run을 연결"""
+    run = RunTelemetry(run_id)
+    _current_run.set(run)
+    return run
+
+
+def finish_run(run: RunTelemetry, persist: bool = True) -> dict:
+    """run 연결 해제 후 집계 반환, persist=True면 호출 기록을 DB에 저장"""
+    if _current_run.get() is run:
+        _current_run.set(None)
+    if persist and run.calls:
+        try:
+            from database import save_llm_calls
+            save_llm_calls(run.run_id, run.calls)
+        except Exception as e:
+            print(f"LLM 호출 기록 저장 실패: {e}")
+    return run.summary()
+
+
+def record_call(label: str, started_at: datetime, latency_ms: float, ttft_ms, prompt_tokens: int,
+                output_tokens: int, retries: int, cache_hit: bool, status: str, error: str = None):
+    """LLMClient가 호출마다 기록. 진행 중인 run이 없으면 무시"""
+    run = _current_run.get()
+    if run is None:
+        return
+    run.record({
+        "label": label,
+        "started_at": started_at.isoformat(sep=" ", timespec="seconds"),
+        "latency_ms": latency_ms,
+        "ttft_ms": ttft_ms,
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "retries": retries,
+        "cache_hit": cache_hit,
+        "status": status,
+        "error": error,
+    })
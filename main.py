@@ -5,10 +5,15 @@ from datetime import datetime
 
 # 모듈 임포트
 from config import *
-from news_scraper import fetch_latest_news_by_rss
-from ner_analyzer import load_ner_model, update_keywords_from_cisa, analyze_risk_with_model, industry_risk_map
-from llm_generator import generate_playbook_with_llm, fetch_headlines_for_summary, generate_dashboard_summary
-from pdf_reporter import create_pdf_report
+from pipeline import (
+    build_profile, crawl_articles, score_articles, aggregate_keywords, build_playbook, build_dashboard_summary,
+    timed, make_result, snapshot_hash, save_run, load_run,
+)
+from article_store import compact_news, store_articles, hydrate
+from resources import get_llm_client, get_ner_model, ensure_cisa_keywords, ensure_db, refresh
+from llm_telemetry import start_run, finish_run
+from tracing import start_trace, finish_trace, resume_trace
+from pdf_reporter import create_pdf_report_cached, get_cached_pdf_report, report_cache_key
 from database import *
 
 # =... (main, render_sidebar, start_analysis, render_tabs, render_dashboard 함수는 이전과 동일) ...
@@ -18,33 +23,40 @@ def main():
     st.set_page_config(**PAGE_CONFIG)
     st.markdown(CSS_STYLES, unsafe_allow_html=True)
     
-    if not GEMINI_API_KEY:
+    if LLM_BACKEND == "gemini" and not GEMINI_API_KEY:
         st.error("Gemini API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
         st.stop()
     
-    import google.generativeai as genai
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-1.5-flash', generation_config=GENERATION_CONFIG)
-    
-    ner_tokenizer, ner_model, ner_ctx = load_ner_model()
-    update_keywords_from_cisa(industry_risk_map)
-    init_db()
+    # 무거운 리소스는 프로세스당 1회만 준비 (재실행 시에는 캐시된 객체 재사용)
+    gemini_model = get_llm_client()
+    ner_tokenizer, ner_model, ner_ctx = get_ner_model()
+    ensure_cisa_keywords()
+    ensure_db()
     
     if 'analysis_started' not in st.session_state:
         st.session_state.analysis_started = False
-        st.session_state.news_data = []
+        st.session_state.news_records = ()
+        st.session_state.keyword_vocab = []
         st.session_state.risk_keywords = []
         st.session_state.playbook_content = ""
         st.session_state.report_summary = ""
         st.session_state.llm_selected_keywords = []
         st.session_state.dashboard_summary = ""
+        st.session_state.llm_telemetry = {}
+        st.session_state.perf_trace = None
         st.session_state.company_name = "중소기업"
         st.session_state.company_size = COMPANY_SIZE_OPTIONS[0]
         st.session_state.industry_type = INDUSTRY_OPTIONS[0]
         st.session_state.infrastructure = INFRASTRUCTURE_OPTIONS[0]
         st.session_state.constraints = ""
         st.session_state.user_interest = ""
+        st.session_state.incremental_playbook = False
         st.session_state.current_page = 1
+        st.session_state.loaded_run = None
+        # 새 세션(새로고침/다른 탭)은 같은 프로필의 최근 실행 결과를 바로 표시
+        latest_run = load_run(current_profile(), max_age_hours=RUN_REUSE_MAX_AGE_HOURS, hydrate=False)
+        if latest_run:
+            load_run_into_session(latest_run)
 
     query_params = st.query_params
     if "delete_news_id" in query_params:
@@ -85,94 +97,142 @@ def render_sidebar():
         st.session_state.infrastructure = st.selectbox("인프라 환경", INFRASTRUCTURE_OPTIONS, index=INFRASTRUCTURE_OPTIONS.index(st.session_state.infrastructure), key='sidebar_infrastructure_select')
         st.session_state.constraints = st.text_area("보안 정책/예산 등 제한사항", value=st.session_state.constraints, key='sidebar_constraints')
         st.session_state.user_interest = st.text_area("관심 분야 키워드(쉼표 구분)", value=st.session_state.user_interest, key='sidebar_user_interest')
+        st.session_state.incremental_playbook = st.checkbox("증분 플레이북 생성 (최근 저장본 기준 변경 섹션만)", value=st.session_state.incremental_playbook, key='sidebar_incremental_playbook')
         
         st.divider()
         if st.button("🔍 분석 시작", type="primary"):
             start_analysis()
+        if st.button("🔄 모델/위협 데이터 새로고침", key="sidebar_refresh_resources"):
+            refresh()
+            st.rerun()
+
+        with st.expander("🕘 분석 기록"):
+            render_run_history()
+
+def render_run_history():
+    runs = get_recent_runs(PAGE_SIZE)
+    if not runs:
+        st.caption("저장된 분석 기록이 없습니다.")
+        return
+    loaded_id = (st.session_state.get("loaded_run") or {}).get("run_id")
+    for run_id, company, industry, article_count, playbook_mode, timings, created_at in runs:
+        total_sec = sum(json.loads(timings or "{}").values()) / 1000.0
+        label = f"{created_at} · {company} ({industry}) · 기사 {article_count}건 · {total_sec:.1f}초"
+        if run_id == loaded_id:
+            st.caption(f"▶ {label}")
+        elif st.button(label, key=f"load_run_{run_id}"):
+            run = get_run(run_id, hydrate=False)
+            if run:
+                load_run_into_session(run)
+                st.rerun()
+
+def current_profile():
+    return build_profile({
+        "company_name": st.session_state.company_name,
+        "company_size": st.session_state.company_size,
+        "industry_type": st.session_state.industry_type,
+        "infrastructure": st.session_state.infrastructure,
+        "constraints": st.session_state.constraints,
+        "user_interest": st.session_state.user_interest,
+        "incremental_playbook": st.session_state.incremental_playbook,
+    })
+
+def load_run_into_session(run):
+    """저장된 실행 기록을 세션 상태로 복원"""
+    st.session_state.analysis_started = True
+    st.session_state.news_records, st.session_state.keyword_vocab = compact_news(run["news_data"])
+    st.session_state.risk_keywords = run["risk_keywords"]
+    st.session_state.playbook_content = run["playbook_content"]
+    st.session_state.llm_selected_keywords = run["llm_selected_keywords"]
+    st.session_state.dashboard_summary = run["dashboard_summary"]
+    st.session_state.report_summary = run["report_summary"]
+    st.session_state.llm_telemetry = run["llm_telemetry"]
+    st.session_state.loaded_run = {"run_id": run.get("run_id"), "created_at": run.get("created_at")}
+    st.session_state.current_page = 1
 
 def start_analysis():
     global ner_tokenizer, ner_model, ner_ctx, gemini_model
     
     st.session_state.analysis_started = True
-    st.session_state.news_data = []
+    st.session_state.news_records = ()
+    st.session_state.keyword_vocab = []
     st.session_state.risk_keywords = []
     st.session_state.playbook_content = ""
     st.session_state.report_summary = ""
     st.session_state.llm_selected_keywords = []
     st.session_state.current_page = 1
+    st.session_state.loaded_run = None
+    telemetry_run = start_run()
+    trace = start_trace()
+    st.session_state.perf_trace = trace
     
-    with st.spinner("RSS에서 뉴스 수집 중..."):
-        articles = fetch_latest_news_by_rss()
+    # 실행 기록 저장(db.save_run)까지 trace에 담고, 예외가 나도 trace/프로파일러가 남지 않게 한다
+    try:
+        profile = current_profile()
+        ner = (ner_tokenizer, ner_model, ner_ctx)
+        timings = {}
+
+        with st.spinner("RSS에서 뉴스 수집 중..."):
+            articles = timed(timings, "crawl", crawl_articles)
+
+        # 같은 프로필로 같은 기사 묶음을 이미 분석했다면 점수화/LLM 호출 없이 재사용
+        previous_run = load_run(profile, articles, hydrate=False)
+        if previous_run:
+            finish_run(telemetry_run)
+            load_run_into_session(previous_run)
+            st.success(f"✅ 같은 조건의 분석 결과({previous_run['created_at']})를 불러왔습니다.")
+            st.rerun()
     
-    with st.spinner("분석/키워드 추출 중..."):
-        news_data = []
-        keyword_counts = {}
-        for art in articles:
-            combined = f"{art['title']} {art['content']}"
-            risk_level, kws, score = analyze_risk_with_model(combined, st.session_state.industry_type, ner_tokenizer, ner_model, ner_ctx)
-            for k in kws:
-                keyword_counts[k] = keyword_counts.get(k, 0) + 1
-            news_data.append({
-                "title": art['title'],
-                "summary": art['content'][:250] + "..." if len(art['content']) > 250 else art['content'],
-                "full_content": art['content'],
-                "source": art.get('source', '보안뉴스'),
-                "published": art.get('date', ''),
-                "risk_level": risk_level,
-                "risk_score": score,
-                "keywords": kws,
-                "url": art['url']
-            })
-        user_interest_list = [kw.strip() for kw in st.session_state.user_interest.split(',') if kw.strip()]
-        for uk in user_interest_list:
-            keyword_counts[uk] = keyword_counts.get(uk, 0) + 1
-        st.session_state.news_data = sorted(news_data, key=lambda x: x['risk_score'], reverse=True)
-        st.session_state.risk_keywords = [
-            {"keyword": kw, "frequency": cnt, "risk_level": analyze_risk_with_model(kw, st.session_state.industry_type, ner_tokenizer, ner_model, ner_ctx)[0]}
-            for kw, cnt in sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)
-        ]
-
-    with st.spinner("LLM 플레이북 생성 중..."):
-        try:
-            company_info = {"name": st.session_state.company_name, "size": st.session_state.company_size, "industry": st.session_state.industry_type}
-            keywords_list = [k["keyword"] for k in st.session_state.risk_keywords]
-            playbook_content, llm_selected_keywords = generate_playbook_with_llm(
-                keywords_list, company_info, st.session_state.infrastructure, st.session_state.constraints, gemini_model, news_briefs=None
+        # 본문이 담긴 news_data는 이 함수 안에서만 쓰고, 세션에는 article_id 기반 레코드만 남긴다
+        with st.spinner("분석/키워드 추출 중..."):
+            news_data = timed(timings, "score", score_articles, articles, profile["industry_type"], ner)
+            store_articles(news_data)
+            st.session_state.risk_keywords = timed(
+                timings, "aggregate", aggregate_keywords,
+                news_data, profile["industry_type"], profile["user_interest"], ner
             )
-            st.session_state.playbook_content = playbook_content
-            st.session_state.llm_selected_keywords = llm_selected_keywords
-        except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "quota" in error_msg.lower():
-                st.error("⚠️ Gemini API 할당량이 초과되었습니다.")
+
+        with st.spinner("LLM 플레이북 생성 중..."):
+            previous = get_latest_playbook() if st.session_state.incremental_playbook else None
+            result = timed(timings, "playbook", build_playbook,
+                           st.session_state.risk_keywords, news_data, profile, gemini_model, previous)
+            if result["mode"] == "reuse":
+                st.info("이전 플레이북 대비 키워드 변화가 없어 저장본을 재사용합니다.")
+            elif result["mode"] == "incremental":
+                delta = result["delta"]
+                st.info(f"변경된 섹션만 재생성했습니다: {', '.join(map(str, delta['sections']))} (신규 {len(delta['added'])}개, 제외 {len(delta['removed'])}개)")
+            elif result["mode"] == "template":
+                st.error(f"⚠️ Gemini API 할당량이 초과되었습니다. ({result['error']})")
                 st.info("기본 템플릿으로 플레이북을 생성합니다.")
-            else:
-                st.error(f"플레이북 생성 중 오류가 발생했습니다: {error_msg}")
-                st.session_state.playbook_content = "플레이북 생성에 실패했습니다."
-                st.session_state.llm_selected_keywords = []
-
-    with st.spinner("대시보드 요약 생성 중..."):
-        dashboard_rss_url = "http://www.boannews.com/media/news_rss.xml?skind=5"
-        headlines = fetch_headlines_for_summary(dashboard_rss_url)
-        if headlines:
-            company_info = {"name": st.session_state.company_name, "size": st.session_state.company_size, "industry": st.session_state.industry_type}
-            summary_text = generate_dashboard_summary(
-                headlines, company_info, st.session_state.infrastructure, st.session_state.constraints, gemini_model
-            )
-            st.session_state.dashboard_summary = summary_text
-        else:
-            st.session_state.dashboard_summary = "최신 보안 동향 요약 정보를 가져오는 데 실패했습니다."
+            elif result["mode"] == "error":
+                st.error(f"플레이북 생성 중 오류가 발생했습니다: {result['error']}")
+            st.session_state.playbook_content = result["playbook"]
+            st.session_state.llm_selected_keywords = result["selected_keywords"]
 
-    st.session_state.report_summary = f"총 {len(st.session_state.news_data)}개 뉴스 분석 완료."
+        with st.spinner("대시보드 요약 생성 중..."):
+            st.session_state.dashboard_summary = timed(timings, "dashboard", build_dashboard_summary, profile, gemini_model)
+
+        st.session_state.llm_telemetry = finish_run(telemetry_run)
+        run = make_result(profile, news_data, st.session_state.risk_keywords, result,
+                          st.session_state.dashboard_summary, timings)
+        run["snapshot_hash"] = snapshot_hash(articles)
+        run["llm_telemetry"] = st.session_state.llm_telemetry
+        st.session_state.report_summary = run["report_summary"]
+        run_id = save_run(run)
+        st.session_state.news_records, st.session_state.keyword_vocab = compact_news(news_data)
+        st.session_state.loaded_run = {"run_id": run_id, "created_at": None}
+    finally:
+        finish_trace(trace)
     st.success("✅ 분석 완료! 아래 탭에서 결과를 확인하세요.")
     st.rerun()
 
 def render_tabs():
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 대시보드", "📰 뉴스 분석", "📋 대응 플레이북", "⭐ 즐겨찾기"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 대시보드", "📰 뉴스 분석", "📋 대응 플레이북", "⭐ 즐겨찾기", "⏱️ 성능"])
     with tab1: render_dashboard()
     with tab2: render_news_analysis()
     with tab3: render_playbook()
     with tab4: render_favorites()
+    with tab5: render_performance()
 
 def render_dashboard():
     if not st.session_state.analysis_started:
@@ -191,6 +251,31 @@ def render_dashboard():
                 <p>{st.session_state.dashboard_summary}</p>
             </div>
             """, unsafe_allow_html=True)
+        telemetry = st.session_state.llm_telemetry
+        if telemetry.get("calls"):
+            st.caption(
+                f"LLM 호출 {telemetry['calls']}회 · 입력 {telemetry['prompt_tokens']:,} / 출력 {telemetry['output_tokens']:,} 토큰 · "
+                f"총 {telemetry['latency_ms_total'] / 1000:.1f}초 · 캐시 적중률 {telemetry['cache_hit_rate']:.0%}"
+            )
+        loaded_run = st.session_state.get("loaded_run") or {}
+        if loaded_run.get("created_at"):
+            st.caption(f"🕘 {loaded_run['created_at']}에 저장된 분석 결과입니다. 최신 기사로 다시 분석하려면 '분석 시작'을 누르세요.")
+        render_keyword_trend()
+
+def render_keyword_trend():
+    """업종별 키워드 추이 (일별/주별 롤업만 조회)"""
+    st.subheader(f"📊 {st.session_state.industry_type} 키워드 추이")
+    period = st.radio("집계 단위", ["daily", "weekly"], format_func=lambda p: "일별" if p == "daily" else "주별",
+                      horizontal=True, key="trend_period", label_visibility="collapsed")
+    days = TREND_DAYS if period == "daily" else TREND_DAYS * 4
+    rows = get_keyword_trend(st.session_state.industry_type, period, days, TREND_TOP_KEYWORDS)
+    if not rows:
+        st.caption("아직 집계된 키워드 추이가 없습니다. 분석을 실행하면 기사 게시일 기준으로 누적됩니다.")
+        return
+    df = pd.DataFrame(rows, columns=["기간", "키워드", "기사 수", "관심도 합계"])
+    df["기간"] = pd.to_datetime(df["기간"])
+    metric = st.radio("지표", ["기사 수", "관심도 합계"], horizontal=True, key="trend_metric", label_visibility="collapsed")
+    st.line_chart(df.pivot(index="기간", columns="키워드", values=metric).fillna(0))
 
 # --- 이 함수가 전체적으로 수정되었습니다 ---
 def render_news_analysis():
@@ -243,10 +328,12 @@ def render_news_analysis():
     </style>
     """, unsafe_allow_html=True)
 
-    news_data = st.session_state.news_data
-    high_news = [n for n in news_data if n["risk_level"] == "높음"][:2]
-    medium_news = [n for n in news_data if n["risk_level"] == "중간"][:2]
-    low_news = [n for n in news_data if n["risk_level"] == "낮음"][:2]
+    # 화면에 표시할 기사만 본문을 불러온다
+    records = st.session_state.news_records
+    vocab = st.session_state.keyword_vocab
+    high_news = hydrate([r for r in records if r.risk_level == "높음"][:2], vocab)
+    medium_news = hydrate([r for r in records if r.risk_level == "중간"][:2], vocab)
+    low_news = hydrate([r for r in records if r.risk_level == "낮음"][:2], vocab)
 
     col1, col2, col3 = st.columns(3)
 
@@ -298,14 +385,19 @@ def render_playbook():
                 "keywords": st.session_state.risk_keywords,
                 "playbook": st.session_state.playbook_content
             }
-            pdf_output = create_pdf_report(report_data, st.session_state.company_name)
-            st.download_button(
-                label="📄 PDF 다운로드",
-                data=pdf_output,
-                file_name=f"보안_분석_보고서_{st.session_state.company_name}.pdf",
-                mime="application/pdf",
-                key="playbook_pdf_download"
-            )
+            # 리런마다 PDF를 만들지 않도록, 요청 시에만 생성하고 내용 해시로 재사용
+            pdf_output = get_cached_pdf_report(report_cache_key(report_data, st.session_state.company_name))
+            if pdf_output is None and st.button("📄 PDF 생성", key="playbook_pdf_build"):
+                with st.spinner("PDF 생성 중..."), resume_trace(st.session_state.get("perf_trace")):
+                    pdf_output = create_pdf_report_cached(report_data, st.session_state.company_name)
+            if pdf_output is not None:
+                st.download_button(
+                    label="📄 PDF 다운로드",
+                    data=pdf_output,
+                    file_name=f"보안_분석_보고서_{st.session_state.company_name}.pdf",
+                    mime="application/pdf",
+                    key="playbook_pdf_download"
+                )
         
         if st.button("⭐ 플레이북 즐겨찾기", key="save_playbook_btn"):
             success, message = save_playbook_to_favorites(
@@ -319,9 +411,10 @@ def render_playbook():
             else:
                 st.warning(message)
             
+        playbook_text = st.session_state.playbook_content.replace('<br>', '\n')
         st.markdown(
             f"""<div class="recommendation-box">
-            <p style="white-space: pre-wrap;">{st.session_state.playbook_content.replace('<br>', '\n')}</p></div>""",
+            <p style="white-space: pre-wrap;">{playbook_text}</p></div>""",
             unsafe_allow_html=True
         )
         if st.session_state.llm_selected_keywords:
@@ -329,10 +422,71 @@ def render_playbook():
             df_llm_kw = pd.DataFrame(st.session_state.llm_selected_keywords)
             st.dataframe(df_llm_kw, use_container_width=True)
 
+def _render_pager(state_key, next_cursor, label):
+    """키셋 페이지 이동 버튼. 방문한 페이지의 cursor를 세션에 스택으로 보관"""
+    cursors = st.session_state[state_key]
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if len(cursors) > 1 and st.button("◀ 이전", key=f"{state_key}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"{label} {len(cursors)}페이지")
+    with col_next:
+        if next_cursor and st.button("다음 ▶", key=f"{state_key}_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+def _render_saved_playbook(playbook, snippet=None):
+    pb_id, title, summary, kws, saved_at = playbook
+    with st.expander(f"**{title}** (저장일: {saved_at.split(' ')[0]})"):
+        if snippet:
+            st.markdown(f"**검색 일치:** {snippet}", unsafe_allow_html=True)
+        st.markdown(f"**요약:** {summary}")
+        st.markdown(f"**주요 키워드:** {', '.join(json.loads(kws))}")
+        # 본문은 펼쳐 볼 때만 조회
+        if st.toggle("내용 보기", key=f"show_pb_{pb_id}"):
+            st.markdown("---")
+            st.markdown(f"**내용:**\n\n{get_playbook_content(pb_id) or ''}", unsafe_allow_html=True)
+            st.markdown("---")
+        if st.button("❌ 삭제", key=f"delete_pb_btn_{pb_id}"):
+            delete_playbook_from_favorites(pb_id)
+            st.rerun()
+
+def _render_saved_news(news, snippet=None):
+    news_id, title, url, summary, kws, risk_level, risk_score, saved_at = news
+    st.markdown(f"""
+        <div class="news-item risk-{risk_level.lower() if risk_level else 'low'}">
+            <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:1rem;">
+                <h5 style="margin:0;color:#2c3e50;">
+                    <a href="{url}" target="_blank">{title}</a>
+                </h5>
+                <span style="background:{'#e74c3c' if risk_level=='높음' else '#f39c12' if risk_level=='중간' else '#27ae60'};color:white;padding:0.3rem 0.8rem;border-radius:15px;font-size:0.8rem;font-weight:bold;white-space:nowrap;">
+                    관심도: {risk_level} ({risk_score:.2f})
+                </span>
+            </div>
+            <p style="color:#555; margin-bottom:1rem; white-space: pre-wrap;">{snippet or summary}</p>
+            <div style="color:#888; font-size:0.9rem;">
+                <strong>키워드:</strong> {', '.join(json.loads(kws))} | 저장일: {saved_at.split(' ')[0]}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    if st.button("❌ 삭제", key=f"delete_news_fav_btn_{news_id}"):
+        delete_news_from_favorites(news_id)
+        st.rerun()
+
 def render_favorites():
     st.header("⭐ 즐겨찾기")
-    saved_news = get_saved_news()
-    saved_playbooks = get_saved_playbooks()
+    query = st.text_input("🔍 즐겨찾기 검색", key="fav_search", placeholder="제목, 요약, 키워드, 플레이북 본문 검색").strip()
+    if query:
+        render_favorites_search(query)
+        return
+
+    for state_key in ("fav_playbook_cursors", "fav_news_cursors"):
+        if state_key not in st.session_state:
+            st.session_state[state_key] = [None]
+    saved_playbooks, next_playbook_cursor = get_saved_playbooks_page(PAGE_SIZE, st.session_state.fav_playbook_cursors[-1])
+    saved_news, next_news_cursor = get_saved_news_page(PAGE_SIZE, st.session_state.fav_news_cursors[-1])
 
     if not saved_news and not saved_playbooks:
         st.info("저장된 기사나 플레이북이 없습니다.")
@@ -340,16 +494,8 @@ def render_favorites():
         st.subheader("저장된 플레이북")
         if saved_playbooks:
             for playbook in saved_playbooks:
-                pb_id, title, summary, content, kws, saved_at = playbook
-                with st.expander(f"**{title}** (저장일: {saved_at.split(' ')[0]})"):
-                    st.markdown(f"**요약:** {summary}")
-                    st.markdown("---")
-                    st.markdown(f"**내용:**\n\n{content}", unsafe_allow_html=True)
-                    st.markdown("---")
-                    st.markdown(f"**주요 키워드:** {', '.join(json.loads(kws))}")
-                    if st.button("❌ 삭제", key=f"delete_pb_btn_{pb_id}"):
-                        delete_playbook_from_favorites(pb_id)
-                        st.rerun()
+                _render_saved_playbook(playbook)
+            _render_pager("fav_playbook_cursors", next_playbook_cursor, "플레이북")
         else:
             st.info("저장된 플레이북이 없습니다.")
 
@@ -357,29 +503,75 @@ def render_favorites():
         st.subheader("저장된 뉴스 기사")
         if saved_news:
             for news in saved_news:
-                news_id, title, url, summary, kws, risk_level, risk_score, saved_at = news
-                st.markdown(f"""
-                    <div class="news-item risk-{risk_level.lower() if risk_level else 'low'}">
-                        <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:1rem;">
-                            <h5 style="margin:0;color:#2c3e50;">
-                                <a href="{url}" target="_blank">{title}</a>
-                            </h5>
-                            <span style="background:{'#e74c3c' if risk_level=='높음' else '#f39c12' if risk_level=='중간' else '#27ae60'};color:white;padding:0.3rem 0.8rem;border-radius:15px;font-size:0.8rem;font-weight:bold;white-space:nowrap;">
-                                관심도: {risk_level} ({risk_score:.2f})
-                            </span>
-                        </div>
-                        <p style="color:#555; margin-bottom:1rem; white-space: pre-wrap;">{summary}</p>
-                        <div style="color:#888; font-size:0.9rem;">
-                            <strong>키워드:</strong> {', '.join(json.loads(kws))} | 저장일: {saved_at.split(' ')[0]}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                if st.button("❌ 삭제", key=f"delete_news_fav_btn_{news_id}"):
-                    delete_news_from_favorites(news_id)
-                    st.rerun()
+                _render_saved_news(news)
+            _render_pager("fav_news_cursors", next_news_cursor, "뉴스")
         else:
             st.info("저장된 뉴스 기사가 없습니다.")
+
+def render_favorites_search(query):
+    """즐겨찾기 전문 검색 결과 (관련도순, 일치 구간 강조)"""
+    playbooks = search_saved_playbooks(query, PAGE_SIZE)
+    news = search_saved_news(query, PAGE_SIZE)
+    if not playbooks and not news:
+        st.info(f"'{query}'에 대한 검색 결과가 없습니다.")
+        return
+    st.subheader(f"플레이북 검색 결과 ({len(playbooks)})")
+    for row in playbooks:
+        _render_saved_playbook(row[:5], snippet=row[5])
+    st.markdown("---")
+    st.subheader(f"뉴스 기사 검색 결과 ({len(news)})")
+    for row in news:
+        _render_saved_news(row[:8], snippet=row[8])
             
+def render_performance():
+    """최근 분석 1회의 단계별 소요 시간 (tracing 스팬 기준)"""
+    st.header("⏱️ 분석 성능")
+    trace = st.session_state.get("perf_trace")
+    if trace is None:
+        st.info("이 세션에서 실행한 분석이 없습니다. '분석 시작'을 누르면 단계별 소요 시간이 기록됩니다.")
+        return
+    report = trace.summary()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("전체 소요", f"{report['wall_ms'] / 1000:.2f}초")
+    if report["cpu_ms"] is not None:
+        col2.metric("CPU 시간 (세션 스레드)", f"{report['cpu_ms'] / 1000:.2f}초")
+    col3.metric("기록된 구간", f"{len(report['spans'])}개")
+
+    # 단계(최상위 스팬)별 비중
+    stages = {name: agg for name, agg in report["by_name"].items() if agg["depth"] == 0}
+    if stages:
+        df_stage = pd.DataFrame([
+            {"단계": name, "소요(ms)": round(agg["wall_ms"], 1), "CPU(ms)": round(agg["cpu_ms"], 1),
+             "건수": agg["items"] or None,
+             "비중": f"{agg['wall_ms'] / report['wall_ms']:.0%}" if report["wall_ms"] else "-"}
+            for name, agg in stages.items()
+        ])
+        st.subheader("단계별 소요 시간")
+        st.bar_chart(df_stage.set_index("단계")["소요(ms)"])
+        st.dataframe(df_stage, use_container_width=True, hide_index=True)
+
+    with st.expander("세부 구간 (모듈별 합계)"):
+        df_detail = pd.DataFrame([
+            {"구간": name, "호출": agg["calls"], "소요(ms)": round(agg["wall_ms"], 1), "CPU(ms)": round(agg["cpu_ms"], 1),
+             "평균(ms)": round(agg["wall_ms"] / agg["calls"], 2), "건수": agg["items"] or None}
+            for name, agg in sorted(report["by_name"].items(), key=lambda x: x[1]["wall_ms"], reverse=True)
+        ])
+        st.dataframe(df_detail, use_container_width=True, hide_index=True)
+
+    if report["profile"]:
+        with st.expander("cProfile 상위 함수 (누적 시간)"):
+            st.dataframe(pd.DataFrame(report["profile"]), use_container_width=True, hide_index=True)
+
+    payload = {"trace": report, "llm_telemetry": st.session_state.llm_telemetry,
+               "loaded_run": st.session_state.get("loaded_run")}
+    st.download_button(
+        label="📥 성능 기록 JSON 다운로드",
+        data=json.dumps(payload, ensure_ascii=False, indent=2, default=str),
+        file_name=f"perf_{report['run_id']}.json",
+        mime="application/json",
+        key="perf_json_download",
+    )
+
 def render_footer():
     st.divider()
     st.markdown(
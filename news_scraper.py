@@ -3,30 +3,38 @@ import feedparser
 import time
 from bs4 import BeautifulSoup
 from datetime import datetime
+from tracing import traced, span
 
+@traced("crawl.parse_html")
+def parse_article_html(html: str, url: str = ""):
+    """보안뉴스 기사 HTML에서 타이틀/본문/일자 추출 (네트워크 없음)"""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # 다양한 템플릿 대응
+    title = soup.select_one("#news_title02") or soup.select_one("h4.tit")
+    body = soup.select_one("#news_content") or soup.select_one("div.view_txt")
+    date = soup.select_one("#news_util01") or soup.select_one("span.date")
+
+    return {
+        "url": url,
+        "title": title.get_text(strip=True) if title else "제목 없음",
+        "date": date.get_text(strip=True) if date else datetime.now().strftime("%Y-%m-%d"),
+        "content": body.get_text("\n", strip=True) if body else "내용 없음",
+        "source": "보안뉴스"
+    }
+
+@traced("crawl.scrape_article")
 def scrape_article(url: str):
     """보안뉴스 기사 상세 스크래핑 (타이틀/본문/일자)"""
     try:
         res = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=7)
         if res.status_code != 200:
             return None
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        # 다양한 템플릿 대응
-        title = soup.select_one("#news_title02") or soup.select_one("h4.tit")
-        body = soup.select_one("#news_content") or soup.select_one("div.view_txt")
-        date = soup.select_one("#news_util01") or soup.select_one("span.date")
-
-        return {
-            "url": url,
-            "title": title.get_text(strip=True) if title else "제목 없음",
-            "date": date.get_text(strip=True) if date else datetime.now().strftime("%Y-%m-%d"),
-            "content": body.get_text("\n", strip=True) if body else "내용 없음",
-            "source": "보안뉴스"
-        }
+        return parse_article_html(res.text, url)
     except Exception:
         return None
 
+@traced("crawl.fetch_rss", items=len)
 def fetch_latest_news_by_rss():
     """보안뉴스 RSS 여러 피드에서 최신 기사 수집"""
     rss_list = [
@@ -42,7 +50,8 @@ def fetch_latest_news_by_rss():
     seen_urls, seen_titles, all_articles = set(), set(), []
     for feed_name, rss_url in rss_list:
         try:
-            feed = feedparser.parse(rss_url)
+            with span("crawl.rss_feed"):
+                feed = feedparser.parse(rss_url)
         except Exception:
             continue
         for entry in getattr(feed, "entries", []):
@@ -0,0 +1,146 @@
+"""
+여러 기업 보고서를 프로세스 풀에서 병렬로 PDF로 내보내는 배치 도구.
+
+입력 JSONL 한 줄 = 보고서 1건:
+    {"company_name": "A사", "summary": "...", "keywords": [{"keyword": "...", "risk_level": "...", "frequency": 3}], "playbook": "..."}
+
+실행:
+    python -m pdf_batch reports.jsonl --out weekly_reports/
+    python -m pdf_batch reports.jsonl --out weekly_reports.zip --zip --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from pdf_reporter import create_pdf_report, warm_font_registry
+
+
+def _init_worker():
+    # 워커 프로세스마다 폰트 메트릭을 한 번만 파싱
+    warm_font_registry()
+
+
+def safe_filename(name: str) -> str:
+    """파일명에 쓸 수 없는 문자/공백을 '_'로 바꾸고 60자로 자른다 (빈 이름은 'report')"""
+    name = re.sub(r'[\\/:*?"<>|\s]+', "_", str(name)).strip("._")
+    return name[:60] or "report"
+
+
+def _render(index: int, payload: dict):
+    """워커에서 실행: PDF 바이트 또는 오류 메시지 반환"""
+    start = time.perf_counter()
+    company_name = payload.get("company_name") or "중소기업"
+    try:
+        pdf = create_pdf_report(payload, company_name)
+        return index, company_name, pdf, None, (time.perf_counter() - start) * 1000.0
+    except Exception as e:
+        return index, company_name, None, str(e), (time.perf_counter() - start) * 1000.0
+
+
+def read_payloads(path: str):
+    """
+    JSONL 파일에서 (줄 번호, 보고서 dict, 오류)를 순서대로 읽는다. 빈 줄은 건너뜀.
+    해석할 수 없는 줄은 배치를 중단하지 않고 (줄 번호, None, 오류 메시지)로 넘긴다.
+    """
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield lineno, None, f"JSON 파싱 실패: {e}"
+                continue
+            if not isinstance(payload, dict):
+                yield lineno, None, "보고서는 JSON 객체여야 합니다"
+                continue
+            yield lineno, payload, None
+
+
+def export_reports(jsonl_path: str, out_path: str, as_zip: bool = False, workers: int = None):
+    """
+    JSONL 보고서들을 병렬 렌더링해 디렉터리(또는 zip)에 저장하고 manifest.json을 함께 쓴다.
+    반환: manifest dict
+    """
+    entries = []
+    archive = None
+    if as_zip:
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        archive = zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_STORED)
+    else:
+        os.makedirs(out_path, exist_ok=True)
+
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = []
+            for index, payload, error in read_payloads(jsonl_path):
+                if error is not None:
+                    entries.append({"line": index, "company_name": None, "elapsed_ms": 0.0, "status": "error", "error": error})
+                else:
+                    futures.append(pool.submit(_render, index, payload))
+            for future in as_completed(futures):
+                index, company_name, pdf, error, elapsed_ms = future.result()
+                entry = {"line": index, "company_name": company_name, "elapsed_ms": round(elapsed_ms, 1)}
+                if pdf is None:
+                    entry.update({"status": "error", "error": error})
+                else:
+                    filename = f"{index:04d}_{safe_filename(company_name)}.pdf"
+                    if archive is not None:
+                        archive.writestr(filename, pdf)
+                    else:
+                        with open(os.path.join(out_path, filename), "wb") as f:
+                            f.write(pdf)
+                    entry.update({
+                        "status": "ok",
+                        "file": filename,
+                        "bytes": len(pdf),
+                        "sha256": hashlib.sha256(pdf).hexdigest(),
+                    })
+                entries.append(entry)
+
+        entries.sort(key=lambda e: e["line"])
+        manifest = {
+            "source": os.path.basename(jsonl_path),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "total": len(entries),
+            "succeeded": sum(1 for e in entries if e["status"] == "ok"),
+            "failed": sum(1 for e in entries if e["status"] != "ok"),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 1),
+            "reports": entries,
+        }
+        manifest_text = json.dumps(manifest, ensure_ascii=False, indent=2)
+        if archive is not None:
+            archive.writestr("manifest.json", manifest_text)
+        else:
+            with open(os.path.join(out_path, "manifest.json"), "w", encoding="utf-8") as f:
+                f.write(manifest_text)
+        return manifest
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="보안 분석 보고서 PDF 일괄 생성")
+    parser.add_argument("jsonl", help="보고서 JSONL 파일")
+    parser.add_argument("--out", required=True, help="출력 디렉터리 (--zip이면 zip 파일 경로)")
+    parser.add_argument("--zip", action="store_true", help="zip 파일 하나로 저장")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args(argv)
+
+    manifest = export_reports(args.jsonl, args.out, as_zip=args.zip, workers=args.workers)
+    print(f"{manifest['succeeded']}/{manifest['total']}건 생성 완료 ({manifest['elapsed_ms'] / 1000:.1f}초) → {args.out}")
+    return 0 if manifest["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,82 +1,237 @@
-import textwrap
 import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
 from fpdf import FPDF
+from config import PDF_CACHE_SIZE
+from tracing import traced
+
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+FONT_FAMILY = "Nanum"
+FONT_CANDIDATES = [
+    "font/NanumGothic.ttf",
+    "font/NanumGothicBold.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf",
+    "C:/Windows/Fonts/NanumGothic.ttf",
+    "C:/Windows/Fonts/NanumGothicBold.ttf",
+]
+
+# 프로세스 전역 폰트 레지스트리: 최초 1회만 TTF/메트릭을 파싱하고 이후 문서는 메모리 사본을 등록
+_font_template = None
+_font_lock = threading.Lock()
 
 def _try_add_font(pdf: FPDF):
     # 가능한 경로들: 로컬/상대경로 모두 시도
-    candidates = [
-        "font/NanumGothic.ttf",
-        "font/NanumGothicBold.ttf",
-        "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
-        "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf",
-        "C:/Windows/Fonts/NanumGothic.ttf",
-        "C:/Windows/Fonts/NanumGothicBold.ttf",
-    ]
-    for path in candidates:
+    for path in FONT_CANDIDATES:
         try:
             # 동일 패밀리명으로 하나만 등록해도 본문 사용에는 지장 없음
-            pdf.add_font("Nanum", "", path, uni=True)
+            pdf.add_font(FONT_FAMILY, "", path, uni=True)
             return True
         except Exception:
             continue
     return False
 
+def _load_font_template():
+    """NanumGothic을 한 번만 파싱해 FPDF 폰트 항목(메트릭/글리프 폭)을 보관. 실패 시 False"""
+    global _font_template
+    if _font_template is None:
+        with _font_lock:
+            if _font_template is None:
+                probe = FPDF()
+                if _try_add_font(probe):
+                    fontkey = FONT_FAMILY.lower()
+                    _font_template = {
+                        "fontkey": fontkey,
+                        "font": dict(probe.fonts[fontkey]),
+                        "font_files": {k: dict(v) for k, v in probe.font_files.items()},
+                    }
+                else:
+                    _font_template = False
+    return _font_template
+
+def warm_font_registry() -> bool:
+    """폰트 레지스트리를 미리 채운다 (앱 시작/워커 초기화 시 호출)"""
+    return bool(_load_font_template())
+
+class _FontSubset(list):
+    """
+    FPDF가 문서별로 사용 글자를 쌓는 subset 목록.
+    기본 list는 글자마다 중복 append되고 폭 테이블 작성 시 'cid in subset'이 선형 탐색이라
+    긴 한글 문서에서 출력이 느려지므로, 중복을 제거하고 포함 검사를 set으로 처리한다.
+    """
+    def __init__(self, iterable=()):
+        super().__init__()
+        self._members = set()
+        for item in iterable:
+            self.append(item)
+
+    def append(self, item):
+        if item not in self._members:
+            self._members.add(item)
+            super().append(item)
+
+    def __contains__(self, item):
+        return item in self._members
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._members = set(self)
+
+def _install_font(pdf: FPDF) -> bool:
+    """
+    레지스트리의 폰트를 새 문서에 등록.
+    글리프 폭(cw) 등 읽기 전용 메트릭은 공유하고, 문서별로 바뀌는 subset 목록만 새로 만든다.
+    """
+    template = _load_font_template()
+    if not template:
+        return False
+    fontkey = template["fontkey"]
+    if fontkey not in pdf.fonts:
+        font = dict(template["font"])
+        font["i"] = len(pdf.fonts) + 1
+        font["subset"] = _FontSubset(template["font"]["subset"])
+        pdf.fonts[fontkey] = font
+        pdf.font_files.update({k: dict(v) for k, v in template["font_files"].items()})
+    return True
+
 def _usable_width(pdf: FPDF) -> float:
     # 현재 페이지에서 좌/우 마진을 제외한 사용 가능 폭
     return pdf.w - pdf.l_margin - pdf.r_margin
 
-def _normalize_long_tokens(s: str) -> str:
+# 줄바꿈 가능 지점: 공백 뒤, URL/CVE/경로 분리자 뒤
+_BREAK_AFTER = set(" /@:_-.|+=")
+_MD_HEADING = re.compile(r'^(#{1,6})\s+(.*)$')
+_MD_BULLET = re.compile(r'^(\s*)([-*•]|\d+[.)])\s+(.*)$')
+_MD_INLINE = re.compile(r'\*\*|__|`')
+
+# (폰트 패밀리, 스타일, 크기) -> {글자: 폭}. 글리프 폭은 문서와 무관하므로 프로세스 전역으로 공유
+_char_width_cache = {}
+
+def _char_widths(pdf: FPDF) -> dict:
+    key = (pdf.font_family, pdf.font_style, pdf.font_size_pt)
+    widths = _char_width_cache.get(key)
+    if widths is None:
+        widths = _char_width_cache.setdefault(key, {})
+    return widths
+
+def clear_layout_cache():
+    """글자 폭 캐시 비우기 (벤치마크의 콜드 측정용)"""
+    _char_width_cache.clear()
+
+def _text_width(pdf: FPDF, text: str, widths: dict) -> float:
+    total = 0.0
+    for ch in text:
+        w = widths.get(ch)
+        if w is None:
+            w = widths[ch] = pdf.get_string_width(ch)
+        total += w
+    return total
+
+def _break_lines(pdf: FPDF, text: str, max_width: float, first_width: float = None):
     """
-    FPDF가 줄바꿈하지 못하는 긴 토큰(URL, CVE, 경로 등)을 안전하게 끊기 위해
-    분리자 뒤에 여백을 추가해 가시적 끊김 포인트를 만든다.
+    글리프 폭 기준 그리디 줄바꿈(한 번의 순회).
+    공백/분리자 뒤에서 끊고, 한 줄보다 긴 토큰(URL 등)은 글자 단위로 자른다.
+    first_width를 주면 첫 줄만 다른 폭(글머리표 등) 적용.
     """
-    # 분리자 뒤에 공백 추가
-    s = re.sub(r'([/@:_\-\.\|\+\=])', r'\1 ', s)
-    # 다중 공백 축소
-    s = re.sub(r'\s{2,}', ' ', s)
-    return s
+    widths = _char_widths(pdf)
+    lines, line, line_w = [], "", 0.0
+    limit = first_width if first_width is not None else max_width
+    word, word_w = "", 0.0
+
+    def flush_word():
+        nonlocal line, line_w, limit, word, word_w
+        if line_w + word_w - (widths.get(" ", 0.0) if word.endswith(" ") else 0.0) <= limit:
+            line, line_w = line + word, line_w + word_w
+        else:
+            if line.strip():
+                lines.append(line.rstrip())
+                limit = max_width
+            line, line_w = "", 0.0
+            # 토큰 자체가 한 줄보다 길면 글자 단위로 분할
+            for ch in word.lstrip():
+                cw = _text_width(pdf, ch, widths)
+                if line_w + cw > limit and line:
+                    lines.append(line.rstrip())
+                    limit = max_width
+                    line, line_w = "", 0.0
+                line, line_w = line + ch, line_w + cw
+        word, word_w = "", 0.0
 
-def _safe_multicell(pdf: FPDF, text: str, line_height: float = 7.0, width: float = None, wrap_chars: int = 100):
+    for ch in text:
+        word += ch
+        word_w += _text_width(pdf, ch, widths)
+        if ch in _BREAK_AFTER:
+            flush_word()
+    if word:
+        flush_word()
+    if line.strip() or not lines:
+        lines.append(line.rstrip())
+    return lines
+
+def _layout_text(pdf: FPDF, text: str, line_height: float = 7.0, width: float = None, markdown: bool = False):
     """
-    - 폭을 명시적으로 지정해 남은 폭이 0에 가까워지는 상황 방지
-    - 긴 토큰을 정규화하고, 실패 시 글자수 기준 하드 래핑으로 폴백
+    텍스트를 측정된 폭으로 한 번에 줄바꿈해 cell 단위로 출력 (재시도 없음).
+    markdown=True면 플레이북의 #헤딩, -/*/1. 글머리표(들여쓰기), **강조** 표기를 처리한다.
     """
     if width is None:
         width = _usable_width(pdf)
+    family, style, size = pdf.font_family, pdf.font_style, pdf.font_size_pt
+    left = pdf.l_margin
 
-    # 항상 좌측 마진으로 위치 초기화
-    pdf.set_x(pdf.l_margin)
+    for raw in (text or "").replace("\r\n", "\n").split("\n"):
+        line = raw.rstrip()
+        if not line.strip():
+            pdf.ln(line_height / 2)
+            continue
+        if not markdown:
+            for part in _break_lines(pdf, line, width):
+                pdf.set_x(left)
+                pdf.cell(width, line_height, part, 0, 1)
+            continue
 
-    # 1차: 정상 출력 시도
-    try:
-        norm = _normalize_long_tokens(text)
-        # textwrap으로 1차 래핑(한 줄 최대 글자수 기준)
-        wrapped = textwrap.fill(norm, width=wrap_chars)
-        pdf.multi_cell(width, line_height, wrapped)
-        return
-    except Exception:
-        pass
-
-    # 2차: 폰트 크기 1pt 낮춰 재시도
-    cur_family, cur_style, cur_size = pdf.font_family, pdf.font_style, pdf.font_size_pt
-    try:
-        if cur_size > 8:
-            pdf.set_font(cur_family, cur_style, cur_size - 1)
-        pdf.set_x(pdf.l_margin)
-        wrapped = textwrap.fill(_normalize_long_tokens(text), width=max(60, wrap_chars - 20))
-        pdf.multi_cell(width, line_height, wrapped)
-        return
-    except Exception:
-        pass
-    finally:
-        # 폰트 복구
-        pdf.set_font(cur_family, cur_style, cur_size)
-
-    # 3차: 하드 슬라이스(강제 청크 분할)
-    for i in range(0, len(text), 100):
-        pdf.set_x(pdf.l_margin)
-        chunk = text[i:i+100]
-        pdf.multi_cell(width, line_height, chunk)
+        line = _MD_INLINE.sub("", line)
+        heading = _MD_HEADING.match(line.strip())
+        bullet = _MD_BULLET.match(line)
+        if heading:
+            level = len(heading.group(1))
+            pdf.set_font(family, style, size + max(0, 4 - level))
+            pdf.ln(line_height / 3)
+            for part in _break_lines(pdf, heading.group(2), width):
+                pdf.set_x(left)
+                pdf.cell(width, line_height + 1, part, 0, 1)
+            pdf.set_font(family, style, size)
+        elif bullet:
+            indent = min(len(bullet.group(1).expandtabs(4)) // 2, 4) * 4.0
+            # 코어 폰트(latin-1) 폴백에서는 '•'를 쓸 수 없으므로 '-' 사용
+            marker = ("•" if pdf.unifontsubset else "-") if bullet.group(2) in "-*•" else bullet.group(2)
+            marker_text = f"{marker} "
+            marker_w = _text_width(pdf, marker_text, _char_widths(pdf))
+            body_width = width - indent - marker_w
+            for i, part in enumerate(_break_lines(pdf, bullet.group(3), body_width)):
+                pdf.set_x(left + indent)
+                if i == 0:
+                    pdf.cell(marker_w, line_height, marker_text, 0, 0)
+                else:
+                    pdf.set_x(left + indent + marker_w)
+                pdf.cell(body_width, line_height, part, 0, 1)
+        else:
+            for part in _break_lines(pdf, line.strip(), width):
+                pdf.set_x(left)
+                pdf.cell(width, line_height, part, 0, 1)
+
+@traced("pdf.create_report")
+def layout_markdown(text: str, font_size: int = 12, line_height: float = 7.0) -> FPDF:
+    """새 문서에 마크다운 텍스트만 배치한 FPDF (보고서 틀 없이 레이아웃 비용만 볼 때)"""
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font(FONT_FAMILY if _install_font(pdf) else "Arial", "", font_size)
+    _layout_text(pdf, text, line_height=line_height, markdown=True)
+    return pdf
 
 def create_pdf_report(report_data, company_name="중소기업"):
     pdf = FPDF()
@@ -84,8 +239,8 @@ def create_pdf_report(report_data, company_name="중소기업"):
     pdf.add_page()
 
     # 폰트 설정
-    if _try_add_font(pdf):
-        base_font = "Nanum"
+    if _install_font(pdf):
+        base_font = FONT_FAMILY
         title_size = 20
         h1_size = 14
         body_size = 12
@@ -107,7 +262,7 @@ def create_pdf_report(report_data, company_name="중소기업"):
     pdf.set_x(pdf.l_margin)
     pdf.cell(_usable_width(pdf), 10, "1. 요약 정보", 0, 1)
     pdf.set_font(base_font, "", body_size)
-    _safe_multicell(pdf, report_data.get("summary", ""), line_height=7.0, width=_usable_width(pdf), wrap_chars=100)
+    _layout_text(pdf, report_data.get("summary", ""), line_height=7.0, width=_usable_width(pdf))
 
     # 2. 키워드
     pdf.ln(5)
@@ -120,7 +275,7 @@ def create_pdf_report(report_data, company_name="중소기업"):
         level = kw.get("risk_level") or kw.get("interest_level") or ""
         freq  = kw.get("frequency", "")
         line = f"- {keyword} | 레벨: {level} | 빈도: {freq}"
-        _safe_multicell(pdf, line, line_height=7.0, width=_usable_width(pdf), wrap_chars=80)
+        _layout_text(pdf, line, line_height=7.0, width=_usable_width(pdf))
 
     # 3. 대응 플레이북
     pdf.ln(5)
@@ -128,10 +283,41 @@ def create_pdf_report(report_data, company_name="중소기업"):
     pdf.set_x(pdf.l_margin)
     pdf.cell(_usable_width(pdf), 10, "3. AI 생성 대응 플레이북", 0, 1)
     pdf.set_font(base_font, "", body_size)
-    _safe_multicell(pdf, report_data.get("playbook", ""), line_height=7.0, width=_usable_width(pdf), wrap_chars=100)
+    _layout_text(pdf, report_data.get("playbook", ""), line_height=7.0, width=_usable_width(pdf), markdown=True)
 
     # 바이트 반환
     out = pdf.output(dest="S")
     if isinstance(out, str):
         out = out.encode("latin1", errors="ignore")
     return bytes(out)
+
+
+def report_cache_key(report_data, company_name="중소기업") -> str:
+    """(요약, 키워드, 플레이북, 기업명) 해시. 내용이 같으면 같은 PDF"""
+    payload = json.dumps(
+        [report_data.get("summary", ""), report_data.get("keywords", []), report_data.get("playbook", ""), company_name],
+        ensure_ascii=False, sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_cached_pdf_report(cache_key: str):
+    """이미 생성된 PDF 바이트 (없으면 None)"""
+    with _pdf_cache_lock:
+        pdf = _pdf_cache.get(cache_key)
+        if pdf is not None:
+            _pdf_cache.move_to_end(cache_key)
+        return pdf
+
+@traced("pdf.report")
+def create_pdf_report_cached(report_data, company_name="중소기업"):
+    """동일 보고서는 한 번만 생성하도록 메모이즈한 create_pdf_report"""
+    cache_key = report_cache_key(report_data, company_name)
+    pdf = get_cached_pdf_report(cache_key)
+    if pdf is not None:
+        return pdf
+    pdf = create_pdf_report(report_data, company_name)
+    with _pdf_cache_lock:
+        _pdf_cache[cache_key] = pdf
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+    return pdf
@@ -0,0 +1,316 @@
+"""
+수집 → 점수화 → 키워드 집계 → 플레이북/대시보드 요약까지의 분석 파이프라인 (UI 비의존).
+Streamlit(main.start_analysis)과 CLI(cli.py)가 같은 단계 함수를 사용한다.
+"""
+import json
+import time
+import hashlib
+from datetime import datetime
+
+from config import COMPANY_SIZE_OPTIONS, INDUSTRY_OPTIONS, INFRASTRUCTURE_OPTIONS, DASHBOARD_RSS_URL
+from news_scraper import fetch_latest_news_by_rss
+from ner_analyzer import extract_signals, score_signals
+from risk_map import get_risk_map
+from llm_generator import (
+    generate_playbook_with_llm, generate_playbook_incremental, fetch_headlines_for_summary,
+    generate_dashboard_summary, build_template_playbook,
+)
+from llm_client import LLMQuotaExceeded
+from tracing import span, start_trace, finish_trace
+
+_NO_NER = (None, None, None)
+
+
+def build_profile(data: dict = None) -> dict:
+    """기업 프로필 dict 정규화 (누락 항목은 사이드바 기본값)"""
+    data = dict(data or {})
+    user_interest = data.get("user_interest", "")
+    if isinstance(user_interest, (list, tuple)):
+        user_interest = ", ".join(user_interest)
+    return {
+        "company_name": data.get("company_name") or "중소기업",
+        "company_size": data.get("company_size") or COMPANY_SIZE_OPTIONS[0],
+        "industry_type": data.get("industry_type") or INDUSTRY_OPTIONS[0],
+        "infrastructure": data.get("infrastructure") or INFRASTRUCTURE_OPTIONS[0],
+        "constraints": data.get("constraints") or "",
+        "user_interest": user_interest or "",
+        "incremental_playbook": bool(data.get("incremental_playbook", False)),
+    }
+
+
+def profile_hash(profile: dict) -> str:
+    """분석 결과에 영향을 주는 프로필 항목의 해시 (실행 기록 조회 키)"""
+    payload = json.dumps(build_profile(profile), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def snapshot_hash(articles, risk_map_version: str = None) -> str:
+    """
+    수집된 기사 구성(url + 본문)과 위험도 맵 버전의 해시. 같은 기사 묶음이면 순서와 무관하게 같은 값.
+    위험도 맵이 바뀌면 점수가 달라지므로 이전 실행 기록을 재사용하지 않도록 버전을 포함한다.
+    """
+    digests = sorted(
+        hashlib.sha256(f"{art['url']}\n{art['title']}\n{art['content']}".encode("utf-8")).hexdigest()
+        for art in articles
+    )
+    digests.append(f"risk_map:{risk_map_version or get_risk_map().version}")
+    return hashlib.sha256("\n".join(digests).encode("utf-8")).hexdigest()
+
+
+def timed(timings: dict, stage: str, fn, *args, **kwargs):
+    """fn 실행 시간을 timings[stage](ms)에 기록하고 결과 반환. 진행 중인 trace가 있으면 stage 스팬도 남긴다."""
+    start = time.perf_counter()
+    with span(stage) as s:
+        result = fn(*args, **kwargs)
+        if isinstance(result, (list, tuple)):
+            s.items = len(result)
+    timings[stage] = round((time.perf_counter() - start) * 1000.0, 1)
+    return result
+
+
+def company_info(profile: dict) -> dict:
+    return {"name": profile["company_name"], "size": profile["company_size"], "industry": profile["industry_type"]}
+
+
+def crawl_articles():
+    """보안뉴스 RSS 수집 + 본문 스크래핑"""
+    return fetch_latest_news_by_rss()
+
+
+def extract_article_signals(articles, ner=_NO_NER, risk_map=None):
+    """업종과 무관한 기사별 신호(NER 엔터티/키워드 매칭) 추출. 여러 프로필이 공유한다."""
+    risk_map = risk_map or get_risk_map()
+    return [extract_signals(f"{art['title']} {art['content']}", *ner, risk_map=risk_map) for art in articles]
+
+
+def score_articles(articles, industry_type: str, ner=_NO_NER, signals=None, risk_map=None):
+    """기사별 관심도/키워드 산정. signals를 주면 추출을 재사용한다. 반환: 점수 내림차순 뉴스 목록"""
+    risk_map = risk_map or get_risk_map()
+    if signals is None:
+        # 단일 프로필: 해당 업종 키워드만 매칭
+        signals = [extract_signals(f"{art['title']} {art['content']}", *ner, industry_type=industry_type, risk_map=risk_map)
+                   for art in articles]
+    news_data = []
+    for art, sig in zip(articles, signals):
+        risk_level, kws, score = score_signals(sig, industry_type, risk_map)
+        news_data.append({
+            "title": art['title'],
+            "summary": art['content'][:250] + "..." if len(art['content']) > 250 else art['content'],
+            "full_content": art['content'],
+            "source": art.get('source', '보안뉴스'),
+            "published": art.get('date', ''),
+            "risk_level": risk_level,
+            "risk_score": score,
+            "keywords": kws,
+            "url": art['url']
+        })
+    return sorted(news_data, key=lambda x: x['risk_score'], reverse=True)
+
+
+def aggregate_keywords(news_data, industry_type: str, user_interest: str = "", ner=_NO_NER, signal_cache: dict = None,
+                       risk_map=None):
+    """
+    기사 키워드 + 사용자 관심 키워드 빈도 집계. 반환: [{"keyword", "frequency", "risk_level"}] 빈도순
+    signal_cache(dict)를 주면 키워드별 신호 추출 결과를 프로필 간에 재사용한다.
+    """
+    keyword_counts = {}
+    for news in news_data:
+        for k in news["keywords"]:
+            keyword_counts[k] = keyword_counts.get(k, 0) + 1
+    for uk in [kw.strip() for kw in (user_interest or "").split(',') if kw.strip()]:
+        keyword_counts[uk] = keyword_counts.get(uk, 0) + 1
+    risk_map = risk_map or get_risk_map()
+    risk_keywords = []
+    for kw, cnt in sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True):
+        if signal_cache is None:
+            signals = extract_signals(kw, *ner, industry_type=industry_type, risk_map=risk_map)
+        else:
+            if kw not in signal_cache:
+                signal_cache[kw] = extract_signals(kw, *ner, risk_map=risk_map)
+            signals = signal_cache[kw]
+        risk_keywords.append({"keyword": kw, "frequency": cnt,
+                              "risk_level": score_signals(signals, industry_type, risk_map)[0]})
+    return risk_keywords
+
+
+def build_playbook(risk_keywords, news_data, profile: dict, gemini_model, previous=None, risk_map=None) -> dict:
+    """
+    플레이북 생성. previous=(저장된 플레이북, 키워드 목록)이면 증분 재생성.
+    반환: {"playbook", "selected_keywords", "mode": full|reuse|incremental|template|error, "delta", "error"}
+    - 할당량 초과 시 템플릿 플레이북으로 대체 (mode='template')
+    """
+    keywords_list = [k["keyword"] for k in risk_keywords]
+    info = company_info(profile)
+    risk_dict = (risk_map or get_risk_map()).weights(profile["industry_type"])
+    keyword_scores = {k["keyword"]: k["frequency"] * risk_dict.get(k["keyword"], 0.5) for k in risk_keywords}
+    news_briefs = [n["title"] for n in news_data]
+    try:
+        if previous:
+            playbook, selected, delta = generate_playbook_incremental(
+                keywords_list, info, profile["infrastructure"], profile["constraints"], gemini_model,
+                previous[0], previous[1], news_briefs=news_briefs, keyword_scores=keyword_scores
+            )
+            return {"playbook": playbook, "selected_keywords": selected, "mode": delta["mode"], "delta": delta, "error": None}
+        playbook, selected = generate_playbook_with_llm(
+            keywords_list, info, profile["infrastructure"], profile["constraints"], gemini_model,
+            news_briefs=news_briefs, keyword_scores=keyword_scores
+        )
+        return {"playbook": playbook, "selected_keywords": selected, "mode": "full", "delta": None, "error": None}
+    except LLMQuotaExceeded as e:
+        playbook = build_template_playbook(keywords_list, info, profile["infrastructure"], profile["constraints"])
+        selected = [{"keyword": k, "rationale": "자동 대체(할당량 초과)"} for k in keywords_list[:12]]
+        return {"playbook": playbook, "selected_keywords": selected, "mode": "template", "delta": None, "error": str(e)}
+    except Exception as e:
+        return {"playbook": "플레이북 생성에 실패했습니다.", "selected_keywords": [], "mode": "error", "delta": None, "error": str(e)}
+
+
+def build_dashboard_summary(profile: dict, gemini_model, rss_url: str = DASHBOARD_RSS_URL, headlines=None) -> str:
+    """대시보드용 최신 동향 3문장 요약. headlines를 주면 RSS를 다시 받지 않는다."""
+    if headlines is None:
+        headlines = fetch_headlines_for_summary(rss_url)
+    if not headlines:
+        return "최신 보안 동향 요약 정보를 가져오는 데 실패했습니다."
+    return generate_dashboard_summary(
+        headlines, company_info(profile), profile["infrastructure"], profile["constraints"], gemini_model
+    )
+
+
+def run_pipeline(profile: dict, gemini_model, ner=_NO_NER, articles=None, previous=None, shared: dict = None) -> dict:
+    """
+    전체 파이프라인 1회 실행. articles를 주면 수집 단계를 건너뛴다.
+    shared(prepare_shared 결과)를 주면 기사 신호/키워드 신호/헤드라인을 재사용하고
+    프로필별 점수화와 LLM 호출만 수행한다.
+    반환: 화면/JSON 출력에 쓰는 결과 dict (단계별 소요 시간 timings_ms 포함)
+    """
+    profile = build_profile(profile)
+    timings = {}
+    # 한 실행 안에서는 같은 위험도 맵 버전을 사용 (도중에 재로딩돼도 점수 기준이 섞이지 않게)
+    risk_map = shared["risk_map"] if shared is not None else get_risk_map()
+
+    if shared is not None:
+        articles = shared["articles"]
+    elif articles is None:
+        articles = timed(timings, "crawl", crawl_articles)
+    signals = shared["signals"] if shared is not None else None
+    signal_cache = shared["keyword_signals"] if shared is not None else None
+    headlines = shared["headlines"] if shared is not None else None
+
+    news_data = timed(timings, "score", score_articles, articles, profile["industry_type"], ner, signals, risk_map)
+    risk_keywords = timed(timings, "aggregate", aggregate_keywords, news_data, profile["industry_type"],
+                          profile["user_interest"], ner, signal_cache, risk_map)
+    playbook = timed(timings, "playbook", build_playbook, risk_keywords, news_data, profile, gemini_model, previous,
+                     risk_map)
+    dashboard_summary = timed(timings, "dashboard", build_dashboard_summary, profile, gemini_model, headlines=headlines)
+    result = make_result(profile, news_data, risk_keywords, playbook, dashboard_summary, timings)
+    result["snapshot_hash"] = shared["snapshot_hash"] if shared is not None else snapshot_hash(articles, risk_map.version)
+    return result
+
+
+def make_result(profile: dict, news_data, risk_keywords, playbook: dict, dashboard_summary: str, timings: dict) -> dict:
+    """단계 결과를 모아 화면/JSON 출력과 실행 기록 저장에 쓰는 결과 dict 구성"""
+    return {
+        "profile": profile,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "news_data": news_data,
+        "risk_keywords": risk_keywords,
+        "playbook_content": playbook["playbook"],
+        "llm_selected_keywords": playbook["selected_keywords"],
+        "playbook_mode": playbook["mode"],
+        "playbook_delta": playbook["delta"],
+        "playbook_error": playbook["error"],
+        "dashboard_summary": dashboard_summary,
+        "report_summary": f"총 {len(news_data)}개 뉴스 분석 완료.",
+        "timings_ms": timings,
+    }
+
+
+def prepare_shared(ner=_NO_NER, articles=None, rss_url: str = DASHBOARD_RSS_URL) -> dict:
+    """
+    여러 프로필이 공유하는 업종 무관 단계: 수집, 기사별 신호 추출, 대시보드 헤드라인 (각 1회).
+    keyword_signals는 프로필별 키워드 집계 중에 채워지는 공유 캐시.
+    """
+    timings = {}
+    if articles is None:
+        articles = timed(timings, "crawl", crawl_articles)
+    risk_map = get_risk_map()
+    signals = timed(timings, "extract", extract_article_signals, articles, ner, risk_map)
+    headlines = timed(timings, "headlines", fetch_headlines_for_summary, rss_url)
+    snapshot = snapshot_hash(articles, risk_map.version)
+    return {"articles": articles, "signals": signals, "keyword_signals": {}, "headlines": headlines,
+            "snapshot_hash": snapshot, "risk_map": risk_map, "timings_ms": timings}
+
+
+def run_many(profiles, gemini_model, ner=_NO_NER, articles=None, workers: int = 4, on_result=None, persist: bool = True):
+    """
+    다중 프로필(멀티 테넌트) 실행: 수집/신호 추출은 1회, 프로필별로 점수화 + LLM 호출만 수행.
+    프로필들은 스레드 풀에서 병렬 처리한다 (LLM 호출 대기 위주). on_result(index, result)는 완료 순서대로 호출.
+    persist=True면 프로필별 결과를 실행 기록(analysis_runs)에 저장한다.
+    한 프로필이 실패해도 배치를 멈추지 않고 그 결과를 {"profile", "error", "llm_telemetry", "trace"}로 돌려준다.
+    반환: (입력 순서의 결과 목록, 공유 단계 소요 시간)
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from llm_telemetry import start_run, finish_run
+
+    shared = prepare_shared(ner, articles)
+
+    def work(profile):
+        # 풀 스레드는 재사용되므로 실패해도 telemetry/trace를 반드시 떼어 낸다
+        telemetry_run = start_run()
+        trace = start_trace()
+        telemetry = None
+        try:
+            result = run_pipeline(profile, gemini_model, ner, shared=shared)
+            # 실행 기록에 LLM 집계가 함께 저장되도록 save_run 전에 마감
+            result["llm_telemetry"] = telemetry = finish_run(telemetry_run)
+            if persist:
+                result["run_id"] = save_run(result)
+        except Exception as e:
+            print(f"프로필 분석 실패 ({profile.get('company_name')}): {e}")
+            result = {"profile": profile, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            if telemetry is None:
+                telemetry = finish_run(telemetry_run)
+            summary = finish_trace(trace)
+        result["llm_telemetry"] = telemetry
+        result["trace"] = summary
+        return result
+
+    results = [None] * len(profiles)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(work, profile): i for i, profile in enumerate(profiles)}
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if on_result is not None:
+                on_result(i, results[i])
+    return results, shared["timings_ms"]
+
+
+def save_run(result: dict):
+    """결과를 실행 기록에 저장. 반환: run id (실패 시 None)"""
+    from database import save_analysis_run
+    try:
+        return save_analysis_run(result, profile_hash(result["profile"]), result["snapshot_hash"])
+    except Exception as e:
+        print(f"분석 실행 기록 저장 실패: {e}")
+        return None
+
+
+def load_run(profile: dict, articles=None, max_age_hours: float = None, hydrate: bool = True):
+    """
+    프로필이 같은 가장 최근 실행 기록. articles를 주면 수집 스냅샷까지 일치하는 실행만 찾는다.
+    hydrate=False면 news_data에 본문 없이 article_id/관심도/점수/키워드만 담는다.
+    반환: 결과 dict (run_id, created_at 포함) 또는 None
+    """
+    from database import get_latest_run
+    try:
+        return get_latest_run(profile_hash(profile), snapshot_hash(articles) if articles is not None else None, max_age_hours,
+                              hydrate)
+    except Exception as e:
+        print(f"분석 실행 기록 조회 실패: {e}")
+        return None
+
+
+def report_payload(result: dict) -> dict:
+    """pdf_reporter.create_pdf_report 입력 형식"""
+    return {"summary": result["report_summary"], "keywords": result["risk_keywords"], "playbook": result["playbook_content"]}
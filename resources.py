@@ -0,0 +1,102 @@
+"""
+프로세스 전역 리소스 (LLM 클라이언트, NER 모델, CISA KEV 키워드, DB 스키마).
+Streamlit은 버튼/위젯 변경마다 main()을 다시 실행하지만 임포트된 모듈은 유지되므로,
+여기 싱글턴에 한 번만 만들어 두고 재실행에서는 그대로 돌려준다.
+CLI/배치에서도 같은 함수를 쓴다. 강제로 다시 만들려면 refresh()를 호출한다.
+"""
+import time
+import threading
+
+from config import CISA_KEV_REFRESH_SEC, CISA_KEV_RETRY_SEC
+
+_lock = threading.RLock()
+_llm_client = None
+_ner = None
+_db_ready = set()
+_cisa = {"checked_at": None, "updated_at": None, "added": 0, "in_flight": False}
+
+
+def get_llm_client():
+    """LLMClient(설정된 백엔드) 싱글턴. genai 임포트/configure는 최초 1회만"""
+    global _llm_client
+    if _llm_client is None:
+        with _lock:
+            if _llm_client is None:
+                from llm_backend import create_backend
+                from llm_client import LLMClient
+                _llm_client = LLMClient(create_backend())
+    return _llm_client
+
+
+def get_ner_model():
+    """(tokenizer, model, ctx) 싱글턴. 모델이 없거나 로드 실패면 (None, None, None)도 그대로 캐시"""
+    global _ner
+    if _ner is None:
+        with _lock:
+            if _ner is None:
+                from ner_analyzer import load_ner_model
+                _ner = load_ner_model()
+    return _ner
+
+
+def ensure_cisa_keywords(force=False):
+    """
+    CISA KEV CVE를 업종별 위험도 맵에 반영. 성공 후 CISA_KEV_REFRESH_SEC 동안은 다시 받지 않고,
+    실패하면(갱신 주기 이후 실패 포함) CISA_KEV_RETRY_SEC 뒤에 재시도한다. 반환: 상태 dict
+    다운로드는 잠금 밖에서 한 스레드만 수행하고, 그동안 다른 세션은 기다리지 않고 현재 상태를 받는다.
+    """
+    now = time.monotonic()
+    with _lock:
+        checked_at, updated_at = _cisa["checked_at"], _cisa["updated_at"]
+        due = not _cisa["in_flight"] and (
+            force or checked_at is None
+            or (now - checked_at >= CISA_KEV_RETRY_SEC
+                and (updated_at is None or now - updated_at >= CISA_KEV_REFRESH_SEC))
+        )
+        if not due:
+            return dict(_cisa)
+        _cisa["in_flight"] = True
+        _cisa["checked_at"] = now
+    added = None
+    try:
+        from ner_analyzer import update_keywords_from_cisa
+        added = update_keywords_from_cisa()
+    finally:
+        with _lock:
+            _cisa["in_flight"] = False
+            if added is not None:
+                _cisa["updated_at"] = time.monotonic()
+                _cisa["added"] += added
+            status = dict(_cisa)
+    return status
+
+
+def ensure_db():
+    """현재 DB 경로에 스키마 마이그레이션을 경로별 1회 적용"""
+    import database
+    path = database.get_db_path()
+    if path not in _db_ready:
+        with _lock:
+            if path not in _db_ready:
+                database.init_db()
+                _db_ready.add(path)
+
+
+def refresh(name=None):
+    """
+    싱글턴 초기화. name: 'llm' | 'ner' | 'cisa' | 'risk_map' | 'db' (None이면 전부)
+    다음 get_*/ensure_* 호출 때 다시 만든다.
+    """
+    global _llm_client, _ner
+    with _lock:
+        if name in (None, "llm"):
+            _llm_client = None
+        if name in (None, "ner"):
+            _ner = None
+        if name in (None, "cisa"):
+            _cisa["checked_at"] = None
+        if name in (None, "risk_map"):
+            from risk_map import invalidate
+            invalidate()
+        if name in (None, "db"):
+            _db_ready.clear()
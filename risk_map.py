@@ -0,0 +1,212 @@
+"""
+업종별 위험도 맵 (data/industry_risk_map.json) 로더.
+JSON을 불변 구조(CompiledRiskMap)로 한 번 컴파일해 두고 모든 세션/스레드가 공유한다.
+- 키워드 id/업종별 가중치 배열/키워드 매칭 정규식(문자 트라이)을 미리 만들어 둔다.
+- 파일이 바뀌면(mtime) 다음 조회 때 다시 컴파일해 참조만 교체한다 (재배포 불필요).
+- CISA KEV 등 런타임 추가 키워드는 기존 객체를 수정하지 않고 새 맵을 만들어 교체한다 (copy-on-write).
+- version은 가중치 내용의 해시이므로, 맵이 바뀌면 이를 키에 포함한 하위 캐시가 자연스럽게 무효화된다.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from types import MappingProxyType
+
+from config import RISK_MAP_PATH, RISK_MAP_CHECK_SEC
+
+
+class CompiledRiskMap:
+    """컴파일된 위험도 맵 (읽기 전용)"""
+    __slots__ = ("version", "file_version", "keywords", "keyword_ids", "industries", "_weights", "_patterns", "_expansions")
+
+    def __init__(self, industries: dict, file_version=None):
+        keywords = []
+        keyword_ids = {}
+        weights = {}
+        for industry, kws in industries.items():
+            ids, ws = [], []
+            for kw, w in kws.items():
+                if kw not in keyword_ids:
+                    keyword_ids[kw] = len(keywords)
+                    keywords.append(kw)
+                ids.append(keyword_ids[kw])
+                ws.append(float(w))
+            weights[industry] = (tuple(ids), tuple(ws))
+        payload = json.dumps(industries, ensure_ascii=False, sort_keys=True)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+        self.file_version = file_version
+        self.version = f"{file_version}-{digest}" if file_version is not None else digest
+        self.keywords = tuple(keywords)
+        self.keyword_ids = MappingProxyType(keyword_ids)
+        self.industries = tuple(weights)
+        self._weights = MappingProxyType({
+            industry: MappingProxyType({keywords[i]: w for i, w in zip(ids, ws)})
+            for industry, (ids, ws) in weights.items()
+        })
+        all_ids = tuple(range(len(keywords)))
+        self._patterns = {None: self._compile(all_ids)}
+        for industry, (ids, _) in weights.items():
+            self._patterns[industry] = self._compile(ids)
+        self._expansions = self._build_expansions()
+
+    def _compile(self, ids):
+        """
+        단어 경계 키워드 매칭 정규식. 키워드를 문자 트라이로 묶어 alternation을 만들면
+        위치마다 키워드 수만큼 비교하지 않고 공통 접두어를 한 번만 비교한다.
+        각 노드에서 더 긴 쪽을 먼저 시도하므로 한 위치에서는 \\b를 만족하는 가장 긴 키워드가 잡힌다.
+        """
+        if not ids:
+            return None
+        trie = {}
+        for i in ids:
+            node = trie
+            for ch in self.keywords[i].lower():
+                node = node.setdefault(ch, {})
+            node[""] = True
+        return re.compile(r"\b(?:" + _trie_pattern(trie) + r")\b", re.IGNORECASE)
+
+    def _build_expansions(self):
+        """
+        매칭된 문자열(소문자) → 같은 위치에서 함께 매칭되는 키워드 id 목록.
+        한 위치에서는 가장 긴 키워드만 잡히므로 ("APT 공격" → "APT") 앞부분이 끝에서 단어 경계를 이루는
+        짧은 키워드와 대소문자만 다른 중복 키워드를 여기서 보충한다.
+        """
+        by_lower = {}
+        for i, kw in enumerate(self.keywords):
+            by_lower.setdefault(kw.lower(), []).append(i)
+        expanded = {}
+        for low, ids in by_lower.items():
+            found = list(ids)
+            for end in range(1, len(low)):
+                if low[:end] in by_lower and _is_word(low[end - 1]) != _is_word(low[end]):
+                    found.extend(by_lower[low[:end]])
+            expanded[low] = tuple(found)
+        return MappingProxyType(expanded)
+
+    def weights(self, industry_type: str):
+        """업종의 {키워드: 가중치} (읽기 전용). 없는 업종이면 빈 매핑"""
+        return self._weights.get(industry_type, _EMPTY)
+
+    def match(self, text: str, industry_type: str = None) -> set:
+        """
+        text에 단어 경계(\\b)로 등장하는 키워드 집합 (대소문자 무시).
+        industry_type이 없으면 전체 업종 키워드 대상. 키워드마다 re.search 하는 것과 같은 결과를 한 번의 스캔으로 낸다.
+        """
+        pattern = self._patterns.get(industry_type)
+        if pattern is None:
+            return set()
+        allowed = None if industry_type is None else self._weights[industry_type]
+        found = set()
+        pos = 0
+        while True:
+            m = pattern.search(text, pos)
+            if not m:
+                break
+            for i in self._expansions.get(m.group(0).lower(), ()):
+                if allowed is None or self.keywords[i] in allowed:
+                    found.add(self.keywords[i])
+            # 겹치는 다음 키워드를 놓치지 않도록 한 글자씩만 전진
+            pos = m.start() + 1
+        return found
+
+    def with_keywords(self, additions: dict):
+        """
+        additions({업종: {키워드: 가중치}}) 중 새 키워드만 더한 새 맵. 반환: (새 맵, 추가 개수)
+        추가할 것이 없으면 자기 자신을 돌려준다.
+        """
+        merged = {industry: dict(self._weights[industry]) for industry in self.industries}
+        added = 0
+        for industry, kws in additions.items():
+            target = merged.setdefault(industry, {})
+            for kw, w in kws.items():
+                if kw not in target:
+                    target[kw] = float(w)
+                    added += 1
+        if not added:
+            return self, 0
+        return CompiledRiskMap(merged, self.file_version), added
+
+
+_EMPTY = MappingProxyType({})
+
+
+def _trie_pattern(node):
+    """트라이 노드 → 정규식. 키워드가 끝나는 노드는 뒤쪽을 선택적(greedy)으로 만든다."""
+    alts = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == "_"
+
+
+_lock = threading.Lock()
+_state = {"map": None, "mtime": None, "checked_at": None}
+_extra = {}  # 런타임 추가 키워드 (파일 재로딩 후에도 유지)
+
+
+def load_file(path: str = RISK_MAP_PATH):
+    """JSON 파일을 읽어 (파일 버전, 업종별 맵) 반환"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("version"), data["industries"]
+
+
+def _build(path):
+    file_version, industries = load_file(path)
+    compiled = CompiledRiskMap(industries, file_version)
+    if _extra:
+        compiled, _ = compiled.with_keywords(_extra)
+    return compiled
+
+
+def get_risk_map() -> CompiledRiskMap:
+    """
+    현재 위험도 맵. RISK_MAP_CHECK_SEC마다 파일 mtime을 확인해 바뀌었으면 다시 컴파일한다.
+    재로딩에 실패하면 기존 맵을 계속 쓴다.
+    """
+    now = time.monotonic()
+    state = _state
+    current, checked_at = state["map"], state["checked_at"]
+    if current is not None and checked_at is not None and now - checked_at < RISK_MAP_CHECK_SEC:
+        return current
+    with _lock:
+        if state["map"] is not None and state["checked_at"] is not None and now - state["checked_at"] < RISK_MAP_CHECK_SEC:
+            return state["map"]
+        try:
+            mtime = os.stat(RISK_MAP_PATH).st_mtime_ns
+            if state["map"] is None or mtime != state["mtime"]:
+                state["map"] = _build(RISK_MAP_PATH)
+                state["mtime"] = mtime
+        except Exception as e:
+            if state["map"] is None:
+                raise
+            print(f"위험도 맵 재로딩 실패 (기존 맵 유지): {e}")
+        state["checked_at"] = now
+        return state["map"]
+
+
+def add_keywords(additions: dict) -> int:
+    """런타임 키워드 추가 ({업종: {키워드: 가중치}}). 새 맵으로 교체하고 추가 개수 반환"""
+    get_risk_map()
+    with _lock:
+        for industry, kws in additions.items():
+            target = dict(_extra.get(industry, {}))
+            target.update({kw: w for kw, w in kws.items() if kw not in target})
+            _extra[industry] = target
+        new_map, added = _state["map"].with_keywords(additions)
+        if added:
+            _state["map"] = new_map
+    return added
+
+
+def invalidate():
+    """다음 get_risk_map() 호출 때 파일을 다시 읽어 재컴파일하게 한다"""
+    with _lock:
+        _state["mtime"] = None
+        _state["checked_at"] = None
@@ -0,0 +1,222 @@
+"""
+분석 1회(run) 단위의 경량 스팬 트레이싱.
+수집/NER/키워드 재점수화/LLM/PDF/DB 함수에 span을 걸어 두면, 진행 중인 trace가 있을 때만
+벽시계 시간, 스레드 CPU 시간, 처리 건수를 기록한다 (trace가 없으면 컨텍스트 변수 조회 1회뿐).
+선택적으로 cProfile을 켜서 상위 함수 목록을 함께 남긴다 (TRACE_PROFILE_SAMPLE_RATE 비율로 샘플링).
+
+    trace = start_trace()
+    with span("crawl") as s:
+        articles = crawl()
+        s.items = len(articles)
+    report = finish_trace(trace)
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import TRACE_PROFILE_SAMPLE_RATE, TRACE_PROFILE_TOP_N
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_span = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    """진행 중인 스팬. items는 블록 안에서 채울 수 있다."""
+    __slots__ = ("id", "name", "parent", "depth", "items", "start", "cpu_start")
+
+    def __init__(self, span_id, name, parent, depth, items):
+        self.id = span_id
+        self.name = name
+        self.parent = parent
+        self.depth = depth
+        self.items = items
+        self.start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+
+
+class _NoSpan:
+    """trace가 없을 때 쓰는 빈 스팬 (items 대입만 받아 버린다)"""
+    __slots__ = ()
+
+    @property
+    def items(self):
+        return None
+
+    @items.setter
+    def items(self, value):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Trace:
+    """분석 1회 동안의 스팬 기록"""
+    def __init__(self, run_id: str = None, profile: bool = False):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = datetime.now()
+        self.spans = []
+        self.profile = None
+        self._origin = time.perf_counter()
+        self._cpu_origin = time.thread_time()
+        self._wall_ms = None
+        self._cpu_ms = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._profiler = cProfile.Profile() if profile else None
+
+    def _new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def record(self, s: Span, wall_ms: float, cpu_ms: float):
+        with self._lock:
+            self.spans.append({
+                "id": s.id,
+                "name": s.name,
+                "parent": s.parent,
+                "depth": s.depth,
+                "start_ms": round((s.start - self._origin) * 1000.0, 3),
+                "wall_ms": round(wall_ms, 3),
+                "cpu_ms": round(cpu_ms, 3),
+                "items": s.items,
+                "thread": threading.current_thread().name,
+            })
+
+    def summary(self) -> dict:
+        """스팬 목록과 이름별 합계 (호출 수, 벽시계/CPU 시간, 처리 건수)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        by_name = {}
+        for s in spans:
+            agg = by_name.setdefault(s["name"], {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "items": 0, "depth": s["depth"]})
+            agg["calls"] += 1
+            agg["wall_ms"] += s["wall_ms"]
+            agg["cpu_ms"] += s["cpu_ms"]
+            agg["items"] += s["items"] or 0
+            agg["depth"] = min(agg["depth"], s["depth"])
+        for agg in by_name.values():
+            agg["wall_ms"] = round(agg["wall_ms"], 3)
+            agg["cpu_ms"] = round(agg["cpu_ms"], 3)
+        wall_ms = self._wall_ms if self._wall_ms is not None else (time.perf_counter() - self._origin) * 1000.0
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(self._cpu_ms, 3) if self._cpu_ms is not None else None,
+            "by_name": by_name,
+            "spans": spans,
+            "profile": self.profile,
+        }
+
+
+def start_trace(run_id: str = None, profile: bool = None) -> Trace:
+    """현재 컨텍스트에 새 trace 연결. profile=None이면 TRACE_PROFILE_SAMPLE_RATE 확률로 cProfile 사용"""
+    if profile is None:
+        profile = TRACE_PROFILE_SAMPLE_RATE > 0 and random.random() < TRACE_PROFILE_SAMPLE_RATE
+    trace = Trace(run_id, profile)
+    _current_trace.set(trace)
+    _current_span.set(None)
+    if trace._profiler is not None:
+        try:
+            trace._profiler.enable()
+        except ValueError:
+            # 다른 프로파일러가 이미 동작 중 (동시 실행 세션 등)
+            trace._profiler = None
+    return trace
+
+
+def finish_trace(trace: Trace) -> dict:
+    """trace 연결 해제 후 요약 반환"""
+    if _current_trace.get() is trace:
+        _current_trace.set(None)
+        _current_span.set(None)
+    trace._wall_ms = (time.perf_counter() - trace._origin) * 1000.0
+    trace._cpu_ms = (time.thread_time() - trace._cpu_origin) * 1000.0
+    if trace._profiler is not None:
+        trace._profiler.disable()
+        trace.profile = _profile_rows(trace._profiler, TRACE_PROFILE_TOP_N)
+        trace._profiler = None
+    return trace.summary()
+
+
+@contextmanager
+def resume_trace(trace: Trace):
+    """끝난 trace에 이후 작업(예: PDF 생성) 스팬을 이어서 기록"""
+    if trace is None:
+        yield
+        return
+    t_token = _current_trace.set(trace)
+    s_token = _current_span.set(None)
+    try:
+        yield
+    finally:
+        _current_span.reset(s_token)
+        _current_trace.reset(t_token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, items: int = None):
+    """이름 붙은 구간 측정. 진행 중인 trace가 없으면 아무것도 하지 않는다."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NO_SPAN
+        return
+    parent = _current_span.get()
+    s = Span(trace._new_id(), name, parent.id if parent else None, parent.depth + 1 if parent else 0, items)
+    token = _current_span.set(s)
+    try:
+        yield s
+    finally:
+        _current_span.reset(token)
+        trace.record(s, (time.perf_counter() - s.start) * 1000.0, (time.thread_time() - s.cpu_start) * 1000.0)
+
+
+def traced(name: str, items=None):
+    """
+    함수 전체를 span으로 감싸는 데코레이터.
+    items: 결과에서 처리 건수를 구하는 함수 (예: len). 실패하면 건수 없이 기록한다.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(name) as s:
+                result = fn(*args, **kwargs)
+                if items is not None and result is not None:
+                    try:
+                        s.items = items(result)
+                    except Exception:
+                        pass
+                return result
+        return wrapper
+    return decorator
+
+
+def _profile_rows(profiler: cProfile.Profile, top_n: int):
+    """cProfile 결과 중 누적 시간 상위 top_n 함수"""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            "function": f"{func} ({filename.rsplit('/', 1)[-1]}:{line})",
+            "calls": nc,
+            "self_ms": round(tt * 1000.0, 3),
+            "cumulative_ms": round(ct * 1000.0, 3),
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:top_n]